@@ -1,15 +1,35 @@
+from contextlib import asynccontextmanager
 from logging import getLogger
 
 from fastapi import FastAPI
 from fastapi.exceptions import HTTPException, RequestValidationError
+from fastapi.responses import ORJSONResponse
 
 from api_config import API_INFO, CORS_CONFIG, ExceptionHandlers
+from database.mariadb.connection import Connection
+from database.mariadb.migrate import migrate
+from database.mariadb.pool import PoolTimeoutError
 from general.config import get_config
 from general.logger import init_logger
+from general.middleware import MetricsMiddleware, RequestIdMiddleware
+import general.endpoints as general
+import movies.endpoints as movies
+from movies.reconciler import rating_reconciler
 import users.endpoints as users
+from users.ratelimit import rate_limit_eviction
+from users.sessions import session_store
+from users.tokens import revocation_list
 
 config = get_config()
-init_logger(config.LOG_LEVEL, config.LOG_FILE, config.CONSOLE_ENABLED)
+init_logger(
+    config.LOG_LEVEL,
+    config.LOG_FILE,
+    config.CONSOLE_ENABLED,
+    config.LOG_QUEUE_SIZE,
+    config.LOG_FORMAT == "json",
+    config.LOG_SAMPLE_RATES,
+    config.LOG_RATE_LIMITS,
+)
 logger = getLogger(__name__)
 
 logger.info("Starting Ace of Spades API")
@@ -17,14 +37,46 @@ logger.info(
     f"Documentation: https://{config.API_HOST}:{config.API_PORT}"
     f"{API_INFO['docs_url']}"
 )
-app = FastAPI(**API_INFO)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await Connection.open_pool()
+    if config.MIGRATE_ON_STARTUP:
+        await migrate()
+    session_store.start()
+    if config.TOKEN_MODE == "signed":
+        await revocation_list.sync()
+        revocation_list.start()
+    rate_limit_eviction.start()
+    rating_reconciler.start()
+    yield
+    await rating_reconciler.stop()
+    await rate_limit_eviction.stop()
+    await revocation_list.stop()
+    await session_store.stop()
+    for stats in Connection.stats():
+        logger.info(f"Closing connection pool: {stats.model_dump()}")
+    await Connection.close_pool()
+
+
+app = FastAPI(
+    lifespan=lifespan, default_response_class=ORJSONResponse, **API_INFO
+)
 
 app.add_middleware(**CORS_CONFIG)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
 app.exception_handler(HTTPException)(ExceptionHandlers.http)
 app.exception_handler(404)(ExceptionHandlers.http)
 app.exception_handler(403)(ExceptionHandlers.http)
 app.exception_handler(401)(ExceptionHandlers.http)
+app.exception_handler(429)(ExceptionHandlers.http)
 app.exception_handler(RequestValidationError)(ExceptionHandlers.validation)
+app.exception_handler(PoolTimeoutError)(ExceptionHandlers.unavailable)
 app.exception_handler(Exception)(ExceptionHandlers.unknown)
 
 app.include_router(users.router)
+app.include_router(movies.router)
+if config.METRICS_ENABLED:
+    app.include_router(general.router)
@@ -33,7 +33,9 @@ CORS_CONFIG = {
 class ExceptionHandlers:
     @classmethod
     async def http(cls, request: Request, exc: HTTPException) -> JSONResponse:
-        return JSONResponse({"error": exc.detail}, exc.status_code)
+        return JSONResponse(
+            {"error": exc.detail}, exc.status_code, headers=exc.headers
+        )
 
     @classmethod
     async def validation(
@@ -42,6 +44,13 @@ class ExceptionHandlers:
         logger.error(exc)
         return JSONResponse({"error": "Unprocessable Entity"}, 422)
 
+    @classmethod
+    async def unavailable(
+        cls, request: Request, exc: Exception
+    ) -> JSONResponse:
+        logger.warning(exc)
+        return JSONResponse({"error": "Service Unavailable"}, 503)
+
     @classmethod
     async def unknown(cls, request: Request, exc: Exception) -> JSONResponse:
         logger.error(exc)
@@ -0,0 +1,47 @@
+import asyncio
+from statistics import quantiles
+from time import perf_counter
+from typing import Awaitable, Callable
+
+
+async def measure(
+    func: Callable[[], Awaitable],
+    iterations: int,
+    concurrency: int = 1,
+) -> list[float]:
+    """
+    Time repeated calls of a coroutine function
+    Args:
+        func (Callable[[], Awaitable]): The function to benchmark
+        iterations (int): The total number of calls
+        concurrency (int): The number of concurrent callers
+    Returns:
+        list[float]: The latency of every call in seconds
+    """
+    samples = []
+    remaining = iter(range(iterations))
+
+    async def worker():
+        for _ in remaining:
+            start = perf_counter()
+            await func()
+            samples.append(perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+def report(name: str, samples: list[float]):
+    """
+    Print the p50 and p99 latency and the throughput of a benchmark
+    Args:
+        name (str): The name of the benchmark
+        samples (list[float]): The latencies in seconds
+    """
+    percentiles = quantiles(samples, n=100)
+    print(
+        f"{name:<32} "
+        f"p50={percentiles[49] * 1000:8.3f}ms "
+        f"p99={percentiles[98] * 1000:8.3f}ms "
+        f"n={len(samples)}"
+    )
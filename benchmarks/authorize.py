@@ -0,0 +1,76 @@
+"""
+Compare the latency of User.authorize with the former three-query path.
+
+Usage: python -m benchmarks.authorize [--iterations N] [--concurrency N]
+"""
+import argparse
+import asyncio
+from datetime import timedelta
+
+from database.mariadb.connection import Connection
+from users.methods import User, auth_cache
+from users.schemas import UserAuth
+
+from . import measure, report
+
+TOKEN = "benchmark_authorize_token"
+
+
+async def legacy_authorize(token: str) -> UserAuth:
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(
+            "SELECT user_id, expiration, NOW() FROM session "
+            "WHERE token = %s AND expiration > NOW()",
+            (token,),
+        )
+        user_data = await cursor.fetchone()
+        if user_data[1] < user_data[2] + timedelta(minutes=15):
+            await cursor.execute(
+                "UPDATE session SET "
+                "expiration = DATE_ADD(NOW(), INTERVAL 1 HOUR) "
+                "WHERE token = %s",
+                (token,),
+            )
+        await cursor.execute(
+            "SELECT role FROM user WHERE id = %s", (user_data[0],)
+        )
+        role = (await cursor.fetchone())[0]
+        return UserAuth(id=user_data[0], role=role)
+
+
+async def main(iterations: int, concurrency: int):
+    await Connection.open_pool()
+    auth_cache.maxsize = 0
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(
+            "INSERT INTO session (user_id, token, expiration) "
+            "SELECT id, %s, DATE_ADD(NOW(), INTERVAL 1 HOUR) FROM user "
+            "ORDER BY id LIMIT 1",
+            (TOKEN,),
+        )
+    try:
+        samples = await measure(
+            lambda: legacy_authorize(TOKEN), iterations, concurrency
+        )
+        report("authorize (three queries)", samples)
+        samples = await measure(
+            lambda: User.authorize(TOKEN), iterations, concurrency
+        )
+        report("authorize (single round trip)", samples)
+    finally:
+        async with Connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "DELETE FROM session WHERE token = %s", (TOKEN,)
+            )
+        await Connection.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.concurrency))
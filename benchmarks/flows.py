@@ -0,0 +1,155 @@
+"""
+Compare the latency of register, login and delete with their former
+one-statement-per-round-trip implementations.
+
+Password hashing uses minimal scrypt parameters so the database round
+trips dominate.
+
+Usage: python -m benchmarks.flows [--iterations N] [--concurrency N]
+"""
+import argparse
+import asyncio
+from itertools import count
+
+from database.mariadb.connection import Connection
+from general.config import get_config
+from users.methods import User
+from users.schemas import UserCreateRequest, UserLoginRequest
+from users.search import trigrams
+from users.security import generate_token, password_hasher
+
+from . import measure, report
+
+config = get_config()
+PASSWORD = "Benchmark123!"
+
+
+def username(i: int) -> str:
+    return f"bench_flow_{i}"
+
+
+async def user_id(i: int) -> int:
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(
+            "SELECT id FROM user WHERE username = %s", (username(i),)
+        )
+        return (await cursor.fetchone())[0]
+
+
+async def legacy_create(i: int):
+    password = await password_hasher.hash(PASSWORD)
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(
+            "INSERT INTO user "
+            "(username, password, email, role, created_at, updated_at) "
+            "VALUES (%s, %s, %s, 'new_user', NOW(), NOW(6))",
+            (username(i), password, f"{username(i)}@email.com"),
+        )
+        new_id = cursor.lastrowid
+        await cursor.execute(
+            "INSERT INTO session (user_id, token, expiration) "
+            "VALUES (%s, %s, DATE_ADD(NOW(), INTERVAL 1 HOUR))",
+            (new_id, generate_token()),
+        )
+        await cursor.execute(
+            "DELETE FROM user_trigram WHERE user_id = %s", (new_id,)
+        )
+        for gram in trigrams(username(i)):
+            await cursor.execute(
+                "INSERT IGNORE INTO user_trigram (trigram, user_id) "
+                "VALUES (%s, %s)",
+                (gram, new_id),
+            )
+
+
+async def legacy_login(i: int):
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(
+            "SELECT id, password FROM user WHERE username = %s",
+            (username(i),),
+        )
+        found_id, password = await cursor.fetchone()
+        await password_hasher.verify(PASSWORD, password)
+        await cursor.execute(
+            "DELETE FROM session WHERE user_id = %s AND expiration < NOW()",
+            (found_id,),
+        )
+        await cursor.execute(
+            "INSERT INTO session (user_id, token, expiration) "
+            "VALUES (%s, %s, DATE_ADD(NOW(), INTERVAL 1 HOUR))",
+            (found_id, generate_token()),
+        )
+
+
+async def legacy_delete(i: int):
+    found_id = await user_id(i)
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(
+            "DELETE FROM session WHERE user_id = %s", (found_id,)
+        )
+        await cursor.execute("DELETE FROM user WHERE id = %s", (found_id,))
+
+
+async def create(i: int):
+    await User.create(UserCreateRequest(
+        username=username(i),
+        password=PASSWORD,
+        email=f"{username(i)}@email.com",
+    ))
+
+
+async def login(i: int):
+    await User.login(
+        UserLoginRequest(username_or_email=username(i), password=PASSWORD)
+    )
+
+
+async def delete(i: int):
+    await User.delete(await user_id(i))
+
+
+async def run(name: str, func, first: int, iterations: int, concurrency: int):
+    ids = count(first)
+    samples = await measure(
+        lambda: func(next(ids)), iterations, concurrency
+    )
+    report(name, samples)
+
+
+async def main(iterations: int, concurrency: int):
+    config.PASSWORD_SCRYPT_N = 16
+    config.PASSWORD_SCRYPT_R = 1
+    await Connection.open_pool()
+    try:
+        for offset, flows in (
+            (0, (legacy_create, legacy_login, legacy_delete)),
+            (iterations, (create, login, delete)),
+        ):
+            for func in flows:
+                await run(
+                    func.__name__, func, offset, iterations, concurrency
+                )
+    finally:
+        async with Connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "DELETE session FROM session JOIN user "
+                "ON user.id = session.user_id "
+                "WHERE user.username LIKE 'bench\\_flow\\_%'"
+            )
+            await cursor.execute(
+                "DELETE FROM user WHERE username LIKE 'bench\\_flow\\_%'"
+            )
+        await Connection.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.concurrency))
@@ -0,0 +1,59 @@
+"""
+Compare logging throughput with and without the queue listener.
+
+Records are written to a temporary log file and to a discarded console
+stream. The emit rate is what the event loop sees; the total rate includes
+draining the queue.
+
+Usage: python -m benchmarks.logger [--records N]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from general.logger import init_logger, stop_logger
+
+
+def run(records: int, queue_size: int) -> tuple[float, float]:
+    root = logging.getLogger()
+    root.handlers.clear()
+    with tempfile.TemporaryDirectory() as directory:
+        init_logger("DEBUG", os.path.join(directory, "log.txt"), True,
+                    queue_size)
+        logger = logging.getLogger("benchmark")
+        start = perf_counter()
+        for i in range(records):
+            logger.info("Record %s", i)
+        emitted = perf_counter() - start
+        stop_logger()
+        total = perf_counter() - start
+        for handler in root.handlers:
+            handler.close()
+        root.handlers.clear()
+    return records / emitted, records / total
+
+
+def main(records: int):
+    stderr = sys.stderr
+    with open(os.devnull, "w") as devnull:
+        sys.stderr = devnull
+        try:
+            direct = run(records, 0)
+            queued = run(records, records)
+        finally:
+            sys.stderr = stderr
+    for name, (emit, total) in (("direct", direct), ("queue", queued)):
+        print(
+            f"{name:<8} emit={emit:12,.0f} records/s "
+            f"total={total:12,.0f} records/s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.records)
@@ -0,0 +1,64 @@
+"""
+Measure password hashing latency and how long it stalls the event loop.
+
+Usage: python -m benchmarks.password [--iterations N] [--concurrency N]
+"""
+import argparse
+import asyncio
+from time import perf_counter
+
+from general.config import get_config
+from users.security import password_hasher, scrypt_hash
+
+from . import measure, report
+
+config = get_config()
+
+
+async def inline_hash():
+    scrypt_hash(
+        "Password123!",
+        config.PASSWORD_SCRYPT_N,
+        config.PASSWORD_SCRYPT_R,
+        config.PASSWORD_SCRYPT_P,
+    )
+
+
+async def loop_lag(stop: asyncio.Event, interval: float = 0.001):
+    """
+    Record how late a periodic wakeup fires while the benchmark runs
+    """
+    samples = []
+    while not stop.is_set():
+        start = perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(perf_counter() - start - interval)
+    return samples
+
+
+async def run(name: str, func, iterations: int, concurrency: int):
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    samples = await measure(func, iterations, concurrency)
+    stop.set()
+    report(name, samples)
+    lag = await lag
+    print(f"{name + ' loop lag':<32} max={max(lag) * 1000:8.3f}ms")
+
+
+async def main(iterations: int, concurrency: int):
+    await run("hash (inline)", inline_hash, iterations, concurrency)
+    await run(
+        "hash (worker pool)",
+        lambda: password_hasher.hash("Password123!"),
+        iterations,
+        concurrency,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.concurrency))
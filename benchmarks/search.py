@@ -0,0 +1,112 @@
+"""
+Compare User.search with the former LIKE '%query%' table scan.
+
+Seeds the user table with synthetic users (removed afterwards unless
+--keep is given) and times typeahead-style queries against both paths.
+
+Usage: python -m benchmarks.search [--users N] [--iterations N] [--keep]
+"""
+import argparse
+import asyncio
+import random
+import string
+
+from database.mariadb.connection import Connection
+from general.pagination import page_size
+from users.methods import User
+from users.search import RELEVANCE, escape_like
+
+from . import measure, report
+
+PREFIX = "bench_"
+CHUNK_SIZE = 10000
+
+
+def username(rng: random.Random) -> str:
+    length = rng.randint(6, 20)
+    return PREFIX + "".join(rng.choices(string.ascii_lowercase, k=length))
+
+
+async def seed(count: int):
+    rng = random.Random(0)
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        for start in range(0, count, CHUNK_SIZE):
+            rows = [
+                (f"{username(rng)}{i}", "", f"{PREFIX}{i}@email.com")
+                for i in range(start, min(start + CHUNK_SIZE, count))
+            ]
+            await cursor.executemany(
+                "INSERT INTO user "
+                "(username, password, email, role, created_at, updated_at) "
+                "VALUES (%s, %s, %s, 'user', NOW(), NOW())",
+                rows,
+            )
+        await cursor.execute(
+            "INSERT IGNORE INTO user_trigram (trigram, user_id) "
+            "SELECT LOWER(SUBSTRING(user.username, seq, 3)), user.id "
+            "FROM user JOIN seq_1_to_255 "
+            "ON seq <= CHAR_LENGTH(user.username) - 2 "
+            "WHERE user.username LIKE %s",
+            (PREFIX.replace("_", "\\_") + "%",),
+        )
+
+
+async def cleanup():
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(
+            "DELETE FROM user WHERE username LIKE %s",
+            (PREFIX.replace("_", "\\_") + "%",),
+        )
+
+
+async def legacy_search(query: str):
+    # The same ranking and page (plus the row probing for a next page) as
+    # User.search, so only the way rows are found differs
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(
+            "SELECT user.id, user.username, user.role, user.profile_picture, "
+            f"{RELEVANCE} AS relevance FROM user "
+            "WHERE user.username LIKE %s "
+            "ORDER BY relevance, user.id LIMIT %s",
+            (
+                query,
+                escape_like(query) + "%",
+                "%" + escape_like(query) + "%",
+                page_size(None) + 1,
+            ),
+        )
+        return await cursor.fetchall()
+
+
+async def main(users: int, iterations: int, keep: bool):
+    await Connection.open_pool()
+    await seed(users)
+    rng = random.Random(1)
+    queries = ["".join(rng.choices("aeiou", k=3)) for _ in range(50)]
+    queries += ["".join(rng.choices(string.ascii_lowercase, k=5))
+                for _ in range(50)]
+    try:
+        samples = await measure(
+            lambda: legacy_search(rng.choice(queries)), iterations
+        )
+        report(f"LIKE scan ({users} users)", samples)
+        samples = await measure(
+            lambda: User.search(rng.choice(queries)), iterations
+        )
+        report(f"trigram index ({users} users)", samples)
+    finally:
+        if not keep:
+            await cleanup()
+        await Connection.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.iterations, args.keep))
@@ -0,0 +1,72 @@
+"""
+Compare the throughput of building and serializing a page of users.
+
+Usage: python -m benchmarks.serialization [--users N] [--iterations N]
+"""
+import argparse
+from timeit import timeit
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from general.responses import ModelResponse
+from general.schemas import Page
+from users.methods import users_from_rows
+from users.schemas import UserReadResponse, user_page_adapter
+
+ROW = (1, "username", "user", "https://example.com/picture.png", 2)
+
+
+def validated_page(rows: list[tuple]) -> Page[UserReadResponse]:
+    return Page[UserReadResponse](
+        items=[
+            UserReadResponse(
+                id=row[0], username=row[1], role=row[2], profile_picture=row[3]
+            )
+            for row in rows
+        ],
+        next_cursor="WzEsIDUwXQ",
+    )
+
+
+def default_path(rows: list[tuple]) -> bytes:
+    # What FastAPI does for a returned model: validate, dump, encode
+    page = validated_page(rows)
+    page = Page[UserReadResponse].model_validate(page.model_dump())
+    return JSONResponse(jsonable_encoder(page.model_dump(mode="json"))).body
+
+
+def orjson_path(rows: list[tuple]) -> bytes:
+    return ORJSONResponse(validated_page(rows).model_dump(mode="json")).body
+
+
+def adapter_path(rows: list[tuple]) -> bytes:
+    page = Page[UserReadResponse](
+        items=users_from_rows(rows), next_cursor="WzEsIDUwXQ"
+    )
+    return ModelResponse(user_page_adapter, page).body
+
+
+def main(users: int, iterations: int):
+    rows = [ROW] * users
+    assert orjson.loads(default_path(rows)) == orjson.loads(adapter_path(rows))
+    for name, func in (
+        ("jsonable_encoder + json", default_path),
+        ("ORJSONResponse", orjson_path),
+        ("TypeAdapter", adapter_path),
+    ):
+        seconds = timeit(lambda: func(rows), number=iterations)
+        print(
+            f"{name:<32} "
+            f"{iterations / seconds:10.0f} pages/s "
+            f"{iterations * users / seconds:12.0f} users/s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.users, args.iterations)
@@ -0,0 +1,150 @@
+import asyncio
+
+
+class RespError(Exception):
+    """An error reply from the key-value server."""
+
+
+def encode(args: tuple) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the key-value server")
+    kind, data = line[:1], line[1:-2]
+    if kind == b"+":
+        return data.decode()
+    if kind == b"-":
+        return RespError(data.decode())
+    if kind == b":":
+        return int(data)
+    if kind == b"$":
+        length = int(data)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2].decode()
+    if kind == b"*":
+        length = int(data)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply from key-value server: {line}")
+
+
+async def read_replies(reader: asyncio.StreamReader, count: int) -> list:
+    return [await read_reply(reader) for _ in range(count)]
+
+
+class KeyValueClient:
+    """
+    A minimal client for servers speaking RESP (Redis, Valkey, KeyDB).
+    Connections are opened on demand, up to `pool_size`, and reused.
+    """
+
+    host: str
+    port: int
+    pool_size: int
+    idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]]
+
+    def __init__(
+        self, host: str, port: int, pool_size: int = 10, timeout: float = 5.0
+    ):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.idle = []
+        self.opened = 0
+        self.available = None
+
+    async def acquire(self):
+        if self.available is None:
+            self.available = asyncio.Semaphore(self.pool_size)
+        await self.available.acquire()
+        if self.idle:
+            return self.idle.pop()
+        try:
+            connection = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+        except BaseException:
+            self.available.release()
+            raise
+        self.opened += 1
+        return connection
+
+    def release(self, connection, healthy: bool):
+        if healthy:
+            self.idle.append(connection)
+        else:
+            connection[1].close()
+            self.opened -= 1
+        self.available.release()
+
+    async def pipeline(self, *commands: tuple) -> list:
+        """
+        Send several commands in one write and read all their replies
+        Args:
+            *commands (tuple): The commands, each a tuple of arguments
+        Returns:
+            list: The replies, with RespError instances for failed commands
+        """
+        connection = await self.acquire()
+        reader, writer = connection
+        healthy = False
+        try:
+            writer.write(b"".join(encode(command) for command in commands))
+            await writer.drain()
+            replies = await asyncio.wait_for(
+                read_replies(reader, len(commands)), self.timeout
+            )
+            healthy = True
+        finally:
+            self.release(connection, healthy)
+        return replies
+
+    async def execute(self, *args):
+        """
+        Run a single command
+        Args:
+            *args: The command and its arguments
+        Returns:
+            The reply
+        """
+        return (await self.execute_all(args))[0]
+
+    async def execute_all(self, *commands: tuple) -> list:
+        """
+        Run several commands in one round trip, failing if any of them did
+        Args:
+            *commands (tuple): The commands, each a tuple of arguments
+        Returns:
+            list: The replies
+        """
+        replies = await self.pipeline(*commands)
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    async def close(self):
+        """Wait for the commands in flight, then close every connection."""
+        available = self.available
+        if available is None:
+            return
+        # Holding every slot means no connection is in use
+        for _ in range(self.pool_size):
+            await available.acquire()
+        while self.idle:
+            _, writer = self.idle.pop()
+            writer.close()
+            self.opened -= 1
+        for _ in range(self.pool_size):
+            available.release()
@@ -0,0 +1,121 @@
+import asyncio
+from time import monotonic
+
+from database.kv.client import encode
+
+
+def reply(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return encode(tuple(value))
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    return b"+%s\r\n" % value.encode()
+
+
+class FakeKeyValueServer:
+    """
+    A local stand-in for a RESP key-value server, supporting the commands
+    the session store uses.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.commands = 0
+        # Commands answered with an error, as by a read-only replica
+        self.failing = set()
+        self.clients = {}
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self.handle, "127.0.0.1", 0
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        # Closing the connections ends the handlers at their next read,
+        # rather than leaving them to be cancelled with the event loop
+        for writer in self.clients.values():
+            writer.close()
+        await asyncio.gather(*self.clients)
+        await self.server.wait_closed()
+
+    def get(self, key: str):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key)
+        return self.data.get(key)
+
+    async def handle(self, reader, writer):
+        self.clients[asyncio.current_task()] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                self.commands += 1
+                writer.write(reply(self.run(*(a.decode() for a in args))))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(asyncio.current_task())
+            writer.close()
+
+    def run(self, command: str, *args):
+        command = command.upper()
+        if command in self.failing:
+            return Exception(f"READONLY can't run {command}")
+        if command == "SET":
+            self.data[args[0]] = args[1]
+            self.expires.pop(args[0], None)
+            if len(args) == 4 and args[2].upper() == "EX":
+                self.expires[args[0]] = monotonic() + int(args[3])
+            return "OK"
+        if command == "GET":
+            return self.get(args[0])
+        if command == "DEL":
+            removed = 0
+            for key in args:
+                removed += self.get(key) is not None
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        if command == "EXPIRE":
+            if self.get(args[0]) is None:
+                return 0
+            self.expires[args[0]] = monotonic() + int(args[1])
+            return 1
+        if command == "TTL":
+            if self.get(args[0]) is None:
+                return -2
+            if args[0] not in self.expires:
+                return -1
+            return int(self.expires[args[0]] - monotonic())
+        if command == "SADD":
+            members = self.get(args[0]) or set()
+            added = len(set(args[1:]) - members)
+            self.data[args[0]] = members | set(args[1:])
+            return added
+        if command == "SREM":
+            members = self.get(args[0]) or set()
+            removed = len(members & set(args[1:]))
+            members -= set(args[1:])
+            return removed
+        if command == "SMEMBERS":
+            return sorted(self.get(args[0]) or ())
+        return Exception(f"unknown command '{command}'")
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from database.kv.client import KeyValueClient, RespError
+
+from .server import FakeKeyValueServer
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    server = FakeKeyValueServer()
+    await server.start()
+    client = KeyValueClient("127.0.0.1", server.port, pool_size=2)
+    client.server = server
+    yield client
+    await client.close()
+    await server.stop()
+
+
+@pytest.mark.anyio
+async def test_execute(client: KeyValueClient):
+    assert await client.execute("SET", "key", "value", "EX", 60) == "OK"
+    assert await client.execute("GET", "key") == "value"
+    assert await client.execute("TTL", "key") in (59, 60)
+    assert await client.execute("GET", "missing") is None
+    assert await client.execute("SADD", "set", "a", "b") == 2
+    assert await client.execute("SMEMBERS", "set") == ["a", "b"]
+    with pytest.raises(RespError):
+        await client.execute("NOPE")
+
+
+@pytest.mark.anyio
+async def test_pipeline(client: KeyValueClient):
+    replies = await client.pipeline(
+        ("SET", "a", 1), ("GET", "a"), ("NOPE",), ("DEL", "a", "b")
+    )
+    assert replies[:2] == ["OK", "1"]
+    assert isinstance(replies[2], RespError)
+    assert replies[3] == 1
+
+
+@pytest.mark.anyio
+async def test_connections_are_reused_and_bounded(client: KeyValueClient):
+    await asyncio.gather(*(client.execute("GET", "a") for _ in range(10)))
+    assert client.opened == 2
+    assert len(client.idle) == 2
+
+
+@pytest.mark.anyio
+async def test_close_waits_for_commands_in_flight(client: KeyValueClient):
+    await client.execute("SET", "key", "value")
+    commands = [
+        asyncio.create_task(client.execute("GET", "key")) for _ in range(4)
+    ]
+    await asyncio.sleep(0)
+    await client.close()
+    assert await asyncio.gather(*commands) == ["value"] * 4
+    assert client.opened == 0
+    assert await client.execute("GET", "key") == "value"
+
+
+@pytest.mark.anyio
+async def test_execute_all(client: KeyValueClient):
+    assert await client.execute_all(("SET", "a", "1"), ("GET", "a")) == [
+        "OK",
+        "1",
+    ]
+    with pytest.raises(RespError, match="unknown command"):
+        await client.execute_all(("GET", "a"), ("NOPE",))
@@ -0,0 +1,44 @@
+from typing import NamedTuple, Sequence
+
+import aiomysql
+
+Statement = tuple[str, Sequence]
+
+
+class BatchResult(NamedTuple):
+    rowcount: int
+    lastrowid: int | None
+
+
+async def execute_batch(
+    cursor: aiomysql.Cursor,
+    statements: list[Statement],
+    transaction: bool = False,
+) -> list[BatchResult]:
+    """
+    Run several statements in a single round trip
+    The cursor must come from a `Connection(multi=True)`, the only pool
+    with the multi-statement client flag. The server stops at the first
+    failing statement; with `transaction` the batch is then rolled back
+    before the error is raised.
+    Args:
+        cursor (aiomysql.Cursor): The cursor to execute with
+        statements (list[Statement]): The statements and their parameters
+        transaction (bool): Whether to wrap the batch in a transaction
+    Returns:
+        list[BatchResult]: The row count and insert id of every statement
+    """
+    if transaction:
+        statements = [("START TRANSACTION", ()), *statements, ("COMMIT", ())]
+    query = ";\n".join(statement for statement, _ in statements)
+    params = [param for _, values in statements for param in values]
+    try:
+        await cursor.execute(query, params or None)
+        results = [BatchResult(cursor.rowcount, cursor.lastrowid)]
+        while await cursor.nextset():
+            results.append(BatchResult(cursor.rowcount, cursor.lastrowid))
+    except Exception:
+        if transaction:
+            await cursor.execute("ROLLBACK")
+        raise
+    return results[1:-1] if transaction else results
@@ -1,34 +1,160 @@
+import logging
+from contextvars import ContextVar
+from itertools import count
 from typing import Self
 
 import aiomysql
 
 from general.config import get_config
+from general.metrics import registry
 
+from .instrumentation import instrumented
+from .pool import Pool, PoolTimeoutError
+from .schemas import PoolStats
+
+logger = logging.getLogger(__name__)
 config = get_config()
 
+# Set once the current request has used the primary, so that its later
+# reads see its own writes instead of a possibly lagging replica
+used_primary: ContextVar[bool] = ContextVar("used_primary", default=False)
+
 
 class Connection:
     conn: aiomysql.Connection | None
+    read_only: bool
+    primary: Pool = Pool(config.MARIADB_HOST)
+    batch: Pool = Pool(config.MARIADB_HOST, multi_statements=True)
+    replicas: list[Pool] = [
+        Pool(host) for host in config.MARIADB_REPLICA_HOSTS
+    ]
+    turn = count()
 
-    def __init__(self):
+    def __init__(self, read_only: bool = False, multi: bool = False):
+        """
+        Args:
+            read_only (bool): Whether the connection is only used to read,
+                allowing it to be served by a replica
+            multi (bool): Whether the connection runs multi-statement
+                batches, served by a separate pool of the primary
+        """
         self.conn = None
+        self.pool = None
+        self.read_only = read_only
+        self.multi = multi
+
+    @classmethod
+    async def open_pool(cls):
+        """Open the application-wide connection pools."""
+        await cls.primary.open()
+        await cls.batch.open()
+        for replica in cls.replicas:
+            try:
+                await replica.open()
+            except (aiomysql.OperationalError, OSError) as e:
+                replica.mark_failed()
+                logger.warning(f"Replica {replica.host} unavailable: {e}")
+
+    @classmethod
+    async def close_pool(cls):
+        """Close the application-wide connection pools."""
+        await cls.primary.close()
+        await cls.batch.close()
+        for replica in cls.replicas:
+            await replica.close()
+
+    @classmethod
+    def stats(cls) -> list[PoolStats]:
+        """
+        Get the connection pool statistics
+        Returns:
+            list[PoolStats]: The statistics of every pool
+        """
+        return [
+            pool.stats()
+            for pool in [cls.primary, cls.batch] + cls.replicas
+        ]
+
+    @classmethod
+    def replica(cls) -> Pool | None:
+        """
+        Choose the replica to serve a read
+        Returns:
+            Pool | None: The replica, or None if none is healthy
+        """
+        replicas = [replica for replica in cls.replicas if replica.healthy]
+        if not replicas:
+            return None
+        if config.MARIADB_REPLICA_STRATEGY == "least_busy":
+            return min(replicas, key=lambda replica: replica.in_use)
+        return replicas[next(cls.turn) % len(replicas)]
 
-    async def cursor(self) -> aiomysql.Cursor:
+    async def cursor(
+        self, cursor_class: type[aiomysql.Cursor] = aiomysql.Cursor
+    ) -> aiomysql.Cursor:
         if not self.conn:
             raise aiomysql.DatabaseError("Not connected to the database")
-        return await self.conn.cursor()
+        return await self.conn.cursor(instrumented(cursor_class))
 
     async def __aenter__(self) -> Self:
-        self.conn = await aiomysql.connect(
-            host=config.MARIADB_HOST,
-            user=config.MARIADB_USER,
-            password=config.MARIADB_PASSWORD,
-            db=config.MARIADB_DATABASE,
-            autocommit=True,
-        )
+        replica = None
+        if self.read_only and not used_primary.get():
+            replica = self.replica()
+        if replica:
+            try:
+                self.conn = await replica.acquire()
+                self.pool = replica
+                return self
+            except (aiomysql.OperationalError, OSError) as e:
+                if not isinstance(e, PoolTimeoutError):
+                    replica.mark_failed()
+                logger.warning(
+                    f"Replica {replica.host} unavailable, "
+                    f"reading from the primary: {e}"
+                )
+        pool = self.batch if self.multi else self.primary
+        self.conn = await pool.acquire()
+        self.pool = pool
+        if not self.read_only:
+            used_primary.set(True)
         return self
 
     async def __aexit__(self, *args, **kwargs):
-        if self.conn:
+        if not self.conn:
+            return
+        result = self.conn._result
+        if result is not None and result.unbuffered_active:
+            # An abandoned unbuffered (SSCursor) result would otherwise be
+            # drained by the next user of the connection
             self.conn.close()
+        self.pool.release(self.conn)
         self.conn = None
+        self.pool = None
+
+
+pool_connections = registry.gauge(
+    "mariadb_pool_connections",
+    "Pooled connections by host and state",
+    ("host", "state"),
+)
+pool_acquisitions = registry.counter(
+    "mariadb_pool_acquisitions_total", "Pool acquisitions by host", ("host",)
+)
+pool_timeouts = registry.counter(
+    "mariadb_pool_timeouts_total", "Pool acquire timeouts by host", ("host",)
+)
+pool_wait = registry.counter(
+    "mariadb_pool_wait_seconds_total",
+    "Time spent waiting for a pooled connection by host",
+    ("host",),
+)
+
+
+@registry.collector
+def collect_pool_stats():
+    for stats in Connection.stats():
+        pool_connections.labels(stats.host, "in_use").set(stats.in_use)
+        pool_connections.labels(stats.host, "idle").set(stats.idle)
+        pool_acquisitions.labels(stats.host).set(stats.acquisitions)
+        pool_timeouts.labels(stats.host).set(stats.timeouts)
+        pool_wait.labels(stats.host).set(stats.wait_time_total)
@@ -0,0 +1,104 @@
+import logging
+import re
+from functools import lru_cache
+from time import perf_counter
+
+import aiomysql
+
+from general.config import get_config
+from general.metrics import registry
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("database.slow_query")
+config = get_config()
+
+LITERAL = re.compile(
+    r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b|%s"
+)
+VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+REPEATED_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+WHITESPACE = re.compile(r"\s+")
+
+query_duration = registry.histogram(
+    "mariadb_query_duration_seconds",
+    "Statement execution and fetch time by statement fingerprint",
+    ("statement", "phase"),
+)
+slow_queries = registry.counter(
+    "mariadb_slow_queries_total",
+    "Statements slower than SLOW_QUERY_THRESHOLD_MS by fingerprint",
+    ("statement",),
+)
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(query: str) -> str:
+    """
+    Normalize a statement so that executions differing only by their
+    parameters, or by the length of their value lists, are grouped
+    Args:
+        query (str): The statement, with placeholders or literal values
+    Returns:
+        str: The fingerprint, free of any parameter value
+    """
+    query = LITERAL.sub("?", query)
+    query = VALUE_LIST.sub("(...)", query)
+    query = REPEATED_LIST.sub("(...)", query)
+    return WHITESPACE.sub(" ", query).strip()
+
+
+class InstrumentedCursorMixin:
+    """Time the statements and fetches of an aiomysql cursor."""
+
+    statement: str = ""
+
+    async def execute(self, query: str, args=None) -> int:
+        start = perf_counter()
+        try:
+            return await super().execute(query, args)
+        finally:
+            duration = perf_counter() - start
+            self.statement = fingerprint(query)
+            query_duration.labels(self.statement, "execute").observe(
+                duration
+            )
+            if duration * 1000 >= config.SLOW_QUERY_THRESHOLD_MS:
+                slow_queries.labels(self.statement).inc()
+                slow_query_logger.warning(
+                    f"Slow query ({duration * 1000:.1f}ms): {self.statement}"
+                )
+
+    async def timed_fetch(self, fetch):
+        start = perf_counter()
+        rows = await fetch
+        query_duration.labels(self.statement, "fetch").observe(
+            perf_counter() - start
+        )
+        return rows
+
+    def fetchone(self):
+        return self.timed_fetch(super().fetchone())
+
+    def fetchmany(self, size: int | None = None):
+        return self.timed_fetch(super().fetchmany(size))
+
+    def fetchall(self):
+        return self.timed_fetch(super().fetchall())
+
+
+@lru_cache(maxsize=None)
+def instrumented(
+    cursor_class: type[aiomysql.Cursor],
+) -> type[aiomysql.Cursor]:
+    """
+    Get the instrumented subclass of a cursor class
+    Args:
+        cursor_class (type[aiomysql.Cursor]): The cursor class
+    Returns:
+        type[aiomysql.Cursor]: The instrumented cursor class
+    """
+    return type(
+        f"Instrumented{cursor_class.__name__}",
+        (InstrumentedCursorMixin, cursor_class),
+        {},
+    )
@@ -0,0 +1,98 @@
+"""
+Apply the versioned schema migrations in database/mariadb/migrations.
+
+Migrations are SQL files named `<version>_<name>.sql`, applied in version
+order and recorded in the `schema_migrations` table. DDL is not
+transactional in MariaDB, so statements must be safe to re-run
+(`IF NOT EXISTS`, `IF EXISTS`) in case a migration is interrupted.
+
+Usage: python -m database.mariadb.migrate
+"""
+import asyncio
+import logging
+from pathlib import Path
+
+from .connection import Connection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PATH = Path(__file__).parent / "migrations"
+LOCK_NAME = "schema_migrations"
+LOCK_TIMEOUT = 60
+
+
+def available() -> list[tuple[int, str, Path]]:
+    """
+    List the migration files
+    Returns:
+        list[tuple[int, str, Path]]: The version, name and path of each file
+    """
+    migrations = []
+    for path in sorted(MIGRATIONS_PATH.glob("*.sql")):
+        version, name = path.stem.split("_", 1)
+        migrations.append((int(version), name, path))
+    return migrations
+
+
+def statements(sql: str) -> list[str]:
+    """
+    Split a migration into statements
+    Args:
+        sql (str): The contents of a migration file
+    Returns:
+        list[str]: The statements, without comment lines
+    """
+    lines = [
+        line for line in sql.splitlines()
+        if not line.strip().startswith("--")
+    ]
+    queries = "\n".join(lines).split(";")
+    return [query.strip() for query in queries if query.strip()]
+
+
+async def migrate() -> list[int]:
+    """
+    Apply every migration that has not been applied yet
+    Returns:
+        list[int]: The versions applied by this call
+    """
+    applied_now = []
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(
+            "SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT)
+        )
+        if not (await cursor.fetchone())[0]:
+            raise TimeoutError("Timed out waiting for the migration lock")
+        try:
+            await cursor.execute(
+                "CREATE TABLE IF NOT EXISTS `schema_migrations` ("
+                "`version` INT NOT NULL, "
+                "`name` VARCHAR(255) NOT NULL, "
+                "`applied_at` DATETIME NOT NULL, "
+                "PRIMARY KEY (`version`))"
+            )
+            await cursor.execute("SELECT version FROM schema_migrations")
+            applied = {row[0] for row in await cursor.fetchall()}
+            for version, name, path in available():
+                if version in applied:
+                    continue
+                logger.info(f"Applying migration {version}: {name}")
+                for query in statements(path.read_text()):
+                    await cursor.execute(query)
+                await cursor.execute(
+                    "INSERT INTO schema_migrations "
+                    "(version, name, applied_at) VALUES (%s, %s, NOW())",
+                    (version, name),
+                )
+                applied_now.append(version)
+        finally:
+            await cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+            await cursor.fetchone()
+    return applied_now
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    versions = asyncio.run(migrate())
+    print(f"Applied migrations: {versions or 'none'}")
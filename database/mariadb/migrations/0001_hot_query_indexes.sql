@@ -0,0 +1,14 @@
+-- Session lookups by token (User.authorize, User.confirm)
+CREATE UNIQUE INDEX IF NOT EXISTS `session_token` ON `session` (`token`);
+-- Sessions of a user by expiration (User.login)
+CREATE INDEX IF NOT EXISTS `session_user_expiration`
+  ON `session` (`user_id`, `expiration`);
+-- Expired session cleanup
+CREATE INDEX IF NOT EXISTS `session_expiration` ON `session` (`expiration`);
+-- Comments of a movie and of a user, newest first
+CREATE INDEX IF NOT EXISTS `comment_movie_created`
+  ON `comment` (`movie_id`, `created_at`);
+CREATE INDEX IF NOT EXISTS `comment_user_created`
+  ON `comment` (`user_id`, `created_at`);
+-- Movie lookups by title
+CREATE INDEX IF NOT EXISTS `movie_title` ON `movie` (`title`);
@@ -0,0 +1,12 @@
+-- Trigram index of usernames for substring search (User.search)
+CREATE TABLE IF NOT EXISTS `user_trigram` (
+  `trigram` CHAR(3) NOT NULL,
+  `user_id` INT NOT NULL,
+  PRIMARY KEY (`trigram`, `user_id`),
+  KEY `user_trigram_user` (`user_id`),
+  FOREIGN KEY (`user_id`) REFERENCES `user`(`id`) ON DELETE CASCADE
+);
+INSERT IGNORE INTO `user_trigram` (`trigram`, `user_id`)
+SELECT LOWER(SUBSTRING(`user`.`username`, `seq`, 3)), `user`.`id`
+FROM `user` JOIN `seq_1_to_255`
+  ON `seq` <= CHAR_LENGTH(`user`.`username`) - 2;
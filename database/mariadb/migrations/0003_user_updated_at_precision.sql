@@ -0,0 +1,2 @@
+-- Microsecond precision so every profile update yields a new ETag
+ALTER TABLE `user` MODIFY `updated_at` DATETIME(6) NOT NULL;
@@ -0,0 +1,9 @@
+-- Signed access tokens of a user issued at or before revoked_at (epoch
+-- seconds) are rejected; rows are purged once such tokens have expired.
+-- No foreign key, so revocations outlive deleted users.
+CREATE TABLE IF NOT EXISTS `token_revocation` (
+  `user_id` INT NOT NULL,
+  `revoked_at` DOUBLE NOT NULL,
+  PRIMARY KEY (`user_id`),
+  KEY `token_revocation_revoked_at` (`revoked_at`)
+);
@@ -0,0 +1,8 @@
+-- TMDB identity for idempotent upserts by the ingestion pipeline
+ALTER TABLE `movie` ADD COLUMN IF NOT EXISTS `tmdb_id` INT NULL AFTER `id`;
+CREATE UNIQUE INDEX IF NOT EXISTS `movie_tmdb_id` ON `movie` (`tmdb_id`);
+-- TMDB overviews, crew and genre lists can be longer than 255 characters
+ALTER TABLE `movie`
+  MODIFY `description` TEXT NOT NULL,
+  MODIFY `genres` TEXT NOT NULL,
+  MODIFY `director` TEXT NOT NULL;
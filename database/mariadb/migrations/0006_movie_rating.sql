@@ -0,0 +1,38 @@
+-- User ratings of movies, one per user and movie, scored 1 to 10
+CREATE TABLE IF NOT EXISTS `rating` (
+  `movie_id` INT NOT NULL,
+  `user_id` INT NOT NULL,
+  `score` TINYINT NOT NULL,
+  `created_at` DATETIME NOT NULL,
+  `updated_at` DATETIME NOT NULL,
+  PRIMARY KEY (`movie_id`, `user_id`),
+  KEY `rating_user` (`user_id`),
+  CONSTRAINT `rating_movie_fk` FOREIGN KEY (`movie_id`)
+    REFERENCES `movie`(`id`),
+  -- A deleted user's ratings go with them; the trigger below has already
+  -- taken them out of the movie aggregates
+  CONSTRAINT `rating_user_fk` FOREIGN KEY (`user_id`)
+    REFERENCES `user`(`id`) ON DELETE CASCADE
+);
+-- Running aggregates of the ratings, kept in step by every rating write
+-- so ace_user_rating (sum / count) is read without scanning `rating`
+ALTER TABLE `movie`
+  ADD COLUMN IF NOT EXISTS `ace_user_rating_sum` BIGINT NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS `ace_user_rating_count` INT NOT NULL DEFAULT 0;
+-- Cascaded deletes fire no triggers on `rating`, so the aggregates are
+-- adjusted before the user row goes. Assignments of a single-table UPDATE
+-- apply left to right, so the average uses the adjusted sum and count.
+CREATE TRIGGER IF NOT EXISTS `user_delete_ratings`
+BEFORE DELETE ON `user` FOR EACH ROW
+UPDATE `movie` SET
+  `ace_user_rating_sum` = `ace_user_rating_sum` - (
+    SELECT `score` FROM `rating`
+    WHERE `rating`.`movie_id` = `movie`.`id` AND `rating`.`user_id` = OLD.`id`
+  ),
+  `ace_user_rating_count` = `ace_user_rating_count` - 1,
+  `ace_user_rating` = IF(
+    `ace_user_rating_count` > 0,
+    `ace_user_rating_sum` / `ace_user_rating_count`,
+    0
+  )
+WHERE `id` IN (SELECT `movie_id` FROM `rating` WHERE `user_id` = OLD.`id`);
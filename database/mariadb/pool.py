@@ -0,0 +1,157 @@
+import asyncio
+from time import monotonic, perf_counter
+
+import aiomysql
+from pymysql.constants import CLIENT
+
+from general.config import get_config
+
+from .schemas import PoolStats
+
+config = get_config()
+
+
+class PoolTimeoutError(aiomysql.OperationalError):
+    """Raised when no pooled connection becomes free in time."""
+
+
+class Pool:
+    """An aiomysql connection pool with acquisition statistics."""
+
+    host: str
+    multi_statements: bool
+    pool: aiomysql.Pool | None
+
+    def __init__(self, host: str, multi_statements: bool = False):
+        """
+        Args:
+            host (str): The host to connect to
+            multi_statements (bool): Whether a query may hold several
+                statements; only enabled for the pool serving batches, so
+                an injection elsewhere cannot stack statements
+        """
+        self.host = host
+        self.multi_statements = multi_statements
+        self.max_size = (
+            config.MARIADB_BATCH_POOL_MAX_SIZE
+            if multi_statements
+            else config.MARIADB_POOL_MAX_SIZE
+        )
+        self.pool = None
+        self.in_use = 0
+        self.failed_at = None
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    @property
+    def name(self) -> str:
+        """The host, marked when the pool serves multi-statement batches."""
+        return f"{self.host}+batch" if self.multi_statements else self.host
+
+    def connect_kwargs(self) -> dict:
+        return {
+            "host": self.host,
+            "user": config.MARIADB_USER,
+            "password": config.MARIADB_PASSWORD,
+            "db": config.MARIADB_DATABASE,
+            "autocommit": True,
+            "client_flag": (
+                CLIENT.MULTI_STATEMENTS if self.multi_statements else 0
+            ),
+            "connect_timeout": config.MARIADB_CONNECT_TIMEOUT,
+        }
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the host has not failed within the retry interval."""
+        return (
+            self.failed_at is None
+            or monotonic() - self.failed_at
+            > config.MARIADB_REPLICA_RETRY_INTERVAL
+        )
+
+    def mark_failed(self):
+        self.failed_at = monotonic()
+
+    async def open(self):
+        """Create the underlying pool, filling it to its minimum size."""
+        if self.pool:
+            return
+        self.pool = await aiomysql.create_pool(
+            minsize=config.MARIADB_POOL_MIN_SIZE,
+            maxsize=self.max_size,
+            pool_recycle=config.MARIADB_POOL_RECYCLE,
+            **self.connect_kwargs(),
+        )
+
+    async def close(self):
+        """Close every connection and drop the underlying pool."""
+        if not self.pool:
+            return
+        self.pool.close()
+        await self.pool.wait_closed()
+        self.pool = None
+
+    async def acquire(self) -> aiomysql.Connection:
+        """
+        Acquire a connection
+        Connects directly when the pool has not been opened, which is the
+        case outside of the application lifespan (scripts and tests).
+        Returns:
+            aiomysql.Connection: The connection
+        """
+        if not self.pool:
+            conn = await aiomysql.connect(**self.connect_kwargs())
+            self.in_use += 1
+            return conn
+        start = perf_counter()
+        try:
+            conn = await asyncio.wait_for(
+                self.pool.acquire(), config.MARIADB_POOL_ACQUIRE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise PoolTimeoutError(
+                f"Timed out acquiring a connection to {self.host}"
+            )
+        self.in_use += 1
+        waited = perf_counter() - start
+        self.acquisitions += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+        return conn
+
+    def release(self, conn: aiomysql.Connection):
+        """
+        Release a connection acquired with `acquire`
+        Args:
+            conn (aiomysql.Connection): The connection
+        """
+        self.in_use -= 1
+        if not self.pool:
+            conn.close()
+            return
+        self.pool.release(conn)
+
+    def stats(self) -> PoolStats:
+        """
+        Get the pool statistics
+        Returns:
+            PoolStats: The statistics
+        """
+        size = self.pool.size if self.pool else 0
+        idle = self.pool.freesize if self.pool else 0
+        return PoolStats(
+            host=self.name,
+            size=size,
+            min_size=config.MARIADB_POOL_MIN_SIZE,
+            max_size=self.max_size,
+            in_use=self.in_use,
+            idle=idle,
+            acquisitions=self.acquisitions,
+            timeouts=self.timeouts,
+            wait_time_total=self.wait_time_total,
+            wait_time_max=self.wait_time_max,
+        )
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+
+
+class PoolStats(BaseModel):
+    host: str = Field(
+        description="The host the pool connects to, suffixed with +batch "
+        "for the multi-statement pool"
+    )
+    size: int = Field(description="The number of open connections")
+    min_size: int = Field(description="The minimum number of connections")
+    max_size: int = Field(description="The maximum number of connections")
+    in_use: int = Field(description="The number of acquired connections")
+    idle: int = Field(description="The number of free connections")
+    acquisitions: int = Field(description="The number of acquisitions")
+    timeouts: int = Field(description="The number of acquire timeouts")
+    wait_time_total: float = Field(
+        description="The total time spent waiting for a connection in seconds"
+    )
+    wait_time_max: float = Field(
+        description="The longest wait for a connection in seconds"
+    )
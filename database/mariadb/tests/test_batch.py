@@ -0,0 +1,76 @@
+import aiomysql
+import pytest
+
+from database.mariadb.batch import BatchResult, execute_batch
+
+
+class FakeCursor:
+    """Replays one (rowcount, lastrowid) per statement, failing at `fail`."""
+
+    def __init__(self, fail: int | None = None):
+        self.fail = fail
+        self.executed = []
+        self.results = []
+
+    async def execute(self, query: str, args=None):
+        self.executed.append((query, args))
+        statements = query.split(";\n")
+        if self.fail is not None and self.fail < len(statements):
+            raise aiomysql.IntegrityError(1062, "Duplicate entry")
+        self.results = [(i, i * 10) for i in range(len(statements))]
+        self.next()
+
+    def next(self):
+        self.rowcount, self.lastrowid = self.results.pop(0)
+
+    async def nextset(self):
+        if not self.results:
+            return None
+        self.next()
+        return True
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_batch_is_one_round_trip():
+    cursor = FakeCursor()
+    results = await execute_batch(
+        cursor, [("SET @a = %s", (1,)), ("DELETE FROM t WHERE a = @a", ())]
+    )
+    assert cursor.executed == [
+        ("SET @a = %s;\nDELETE FROM t WHERE a = @a", [1]),
+    ]
+    assert results == [BatchResult(0, 0), BatchResult(1, 10)]
+
+
+@pytest.mark.anyio
+async def test_transaction_results_skip_control_statements():
+    cursor = FakeCursor()
+    results = await execute_batch(
+        cursor, [("INSERT INTO t VALUES (%s)", (1,))], transaction=True
+    )
+    assert cursor.executed[0][0] == (
+        "START TRANSACTION;\nINSERT INTO t VALUES (%s);\nCOMMIT"
+    )
+    assert results == [BatchResult(1, 10)]
+
+
+@pytest.mark.anyio
+async def test_transaction_rolls_back_on_error():
+    cursor = FakeCursor(fail=1)
+    with pytest.raises(aiomysql.IntegrityError):
+        await execute_batch(
+            cursor, [("INSERT INTO t VALUES (1)", ())], transaction=True
+        )
+    assert cursor.executed[-1] == ("ROLLBACK", None)
+
+
+@pytest.mark.anyio
+async def test_batch_without_params_is_not_formatted():
+    cursor = FakeCursor()
+    await execute_batch(cursor, [("SELECT '100%'", ())])
+    assert cursor.executed == [("SELECT '100%'", None)]
@@ -0,0 +1,103 @@
+import aiomysql
+import pytest
+from pymysql.constants import CLIENT
+
+from database.mariadb.connection import Connection, used_primary
+from database.mariadb.pool import Pool
+
+
+class FakeConnection:
+    _result = None
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def fake_pool(
+    host: str, fail: bool = False, multi_statements: bool = False
+) -> Pool:
+    pool = Pool(host, multi_statements)
+
+    async def acquire():
+        if fail:
+            raise aiomysql.OperationalError(2003, "Can't connect")
+        pool.in_use += 1
+        return FakeConnection()
+
+    def release(conn):
+        pool.in_use -= 1
+
+    pool.acquire = acquire
+    pool.release = release
+    return pool
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    primary = fake_pool("primary")
+    replicas = [fake_pool("replica1"), fake_pool("replica2")]
+    monkeypatch.setattr(Connection, "primary", primary)
+    monkeypatch.setattr(
+        Connection, "batch", fake_pool("primary", multi_statements=True)
+    )
+    monkeypatch.setattr(Connection, "replicas", replicas)
+    used_primary.set(False)
+    return primary, replicas
+
+
+async def host(read_only: bool, multi: bool = False) -> str:
+    async with Connection(read_only=read_only, multi=multi) as conn:
+        return conn.pool.name
+
+
+@pytest.mark.anyio
+async def test_reads_are_balanced_across_replicas(pools):
+    hosts = {await host(read_only=True) for _ in range(4)}
+    assert hosts == {"replica1", "replica2"}
+
+
+@pytest.mark.anyio
+async def test_least_busy_replica(pools, monkeypatch):
+    _, replicas = pools
+    monkeypatch.setattr(
+        "database.mariadb.connection.config.MARIADB_REPLICA_STRATEGY",
+        "least_busy",
+    )
+    async with Connection(read_only=True) as conn:
+        assert conn.pool.host == "replica1"
+        assert await host(read_only=True) == "replica2"
+
+
+@pytest.mark.anyio
+async def test_reads_after_write_use_primary(pools):
+    assert await host(read_only=True) != "primary"
+    assert await host(read_only=False) == "primary"
+    assert await host(read_only=True) == "primary"
+
+
+@pytest.mark.anyio
+async def test_failed_replica_falls_back(pools, monkeypatch):
+    primary = pools[0]
+    broken = fake_pool("broken", fail=True)
+    monkeypatch.setattr(Connection, "replicas", [broken])
+    assert await host(read_only=True) == "primary"
+    assert not broken.healthy
+    assert await host(read_only=True) == "primary"
+    assert primary.in_use == 0
+
+
+def test_only_the_batch_pool_allows_multi_statements():
+    assert Pool("primary").connect_kwargs()["client_flag"] == 0
+    assert (
+        Pool("primary", multi_statements=True).connect_kwargs()["client_flag"]
+        == CLIENT.MULTI_STATEMENTS
+    )
+
+
+@pytest.mark.anyio
+async def test_batches_use_the_batch_pool(pools):
+    assert await host(read_only=False, multi=True) == "primary+batch"
+    # A batch is a write, so later reads see it on the primary
+    assert await host(read_only=True) == "primary"
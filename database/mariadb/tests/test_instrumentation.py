@@ -0,0 +1,32 @@
+import aiomysql
+
+from database.mariadb.instrumentation import fingerprint, instrumented
+
+
+def test_fingerprint_redacts_values():
+    assert fingerprint(
+        "SELECT id FROM user\n  WHERE username = 'Admin' AND id > 10"
+    ) == "SELECT id FROM user WHERE username = ? AND id > ?"
+    assert fingerprint(
+        "SELECT id FROM user WHERE email = %s"
+    ) == "SELECT id FROM user WHERE email = ?"
+    assert fingerprint(
+        "SELECT 1 FROM seq_1_to_255 WHERE note = 'it\\'s'"
+    ) == "SELECT ? FROM seq_1_to_255 WHERE note = ?"
+
+
+def test_fingerprint_collapses_lists():
+    assert fingerprint(
+        "UPDATE session SET expiration = NOW() WHERE token IN (%s, %s, %s)"
+    ) == fingerprint(
+        "UPDATE session SET expiration = NOW() WHERE token IN ('a')"
+    )
+    assert fingerprint(
+        "INSERT INTO t (a, b) VALUES (1, 'x'),(2, 'y'), (3, 'z')"
+    ) == "INSERT INTO t (a, b) VALUES (...)"
+
+
+def test_instrumented_cursor_classes():
+    cursor_class = instrumented(aiomysql.SSCursor)
+    assert issubclass(cursor_class, aiomysql.SSCursor)
+    assert instrumented(aiomysql.SSCursor) is cursor_class
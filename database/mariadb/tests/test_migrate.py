@@ -0,0 +1,20 @@
+from database.mariadb.migrate import available, statements
+
+
+def test_available_migrations_are_ordered():
+    versions = [version for version, _, _ in available()]
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+
+
+def test_statements():
+    sql = (
+        "-- A comment; with a semicolon\n"
+        "CREATE INDEX IF NOT EXISTS `a`\n  ON `t` (`c`);\n"
+        "\n"
+        "DROP INDEX IF EXISTS `b` ON `t`;\n"
+    )
+    assert statements(sql) == [
+        "CREATE INDEX IF NOT EXISTS `a`\n  ON `t` (`c`)",
+        "DROP INDEX IF EXISTS `b` ON `t`",
+    ]
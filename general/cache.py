@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """A bounded in-memory cache with per-entry expiry and LRU eviction."""
+
+    maxsize: int
+    ttl: float
+    entries: OrderedDict[K, tuple[float, V]]
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: K) -> V | None:
+        """
+        Get a value, refreshing its position in the LRU order
+        Args:
+            key (K): The key
+        Returns:
+            V | None: The value, or None if missing or expired
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None):
+        """
+        Store a value, evicting the least recently used entry when full
+        Args:
+            key (K): The key
+            value (V): The value
+            ttl (float | None): The lifetime in seconds, capped by `self.ttl`
+        """
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            self.entries.pop(key, None)
+            return
+        self.entries[key] = (monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        """
+        Remove a value
+        Args:
+            key (K): The key
+        Returns:
+            V | None: The removed value, if any
+        """
+        entry = self.entries.pop(key, None)
+        return entry[1] if entry else None
+
+    def discard_if(self, predicate: Callable[[K, V], bool]) -> int:
+        """
+        Remove every entry matching a predicate
+        Args:
+            predicate (Callable[[K, V], bool]): Called with each key and value
+        Returns:
+            int: The number of removed entries
+        """
+        keys = [k for k, (_, v) in self.entries.items() if predicate(k, v)]
+        for key in keys:
+            del self.entries[key]
+        return len(keys)
+
+    def clear(self):
+        self.entries.clear()
@@ -1,4 +1,6 @@
 from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,11 +16,85 @@ class Config(BaseSettings, extra="ignore"):
     LOG_LEVEL: str
     LOG_FILE: str
     CONSOLE_ENABLED: bool
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+    LOG_RATE_LIMITS: dict[str, float] = {}
+    METRICS_ENABLED: bool = False
 
     MARIADB_HOST: str
     MARIADB_USER: str
     MARIADB_PASSWORD: str
     MARIADB_DATABASE: str
+    MARIADB_POOL_MIN_SIZE: int = 1
+    MARIADB_POOL_MAX_SIZE: int = 10
+    MARIADB_BATCH_POOL_MAX_SIZE: int = 5
+    MARIADB_POOL_ACQUIRE_TIMEOUT: float = 5.0
+    MARIADB_POOL_RECYCLE: int = 3600
+    MARIADB_CONNECT_TIMEOUT: float = 5.0
+    MARIADB_REPLICA_HOSTS: list[str] = []
+    MARIADB_REPLICA_STRATEGY: Literal["round_robin", "least_busy"] = (
+        "round_robin"
+    )
+    MARIADB_REPLICA_RETRY_INTERVAL: float = 30.0
+    MIGRATE_ON_STARTUP: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 100
+    STREAM_CHUNK_SIZE: int = 1000
+
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL: float = 60.0
+
+    SEARCH_CACHE_SIZE: int = 0
+    SEARCH_CACHE_TTL: float = 1.0
+
+    USER_VERSION_CACHE_SIZE: int = 10000
+    USER_VERSION_CACHE_TTL: float = 5.0
+    USER_CACHE_CONTROL: str = "no-cache"
+
+    PASSWORD_SCRYPT_N: int = 2**14
+    PASSWORD_SCRYPT_R: int = 8
+    PASSWORD_SCRYPT_P: int = 1
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_IP_RATE: float = 1.0
+    RATE_LIMIT_IP_BURST: int = 20
+    RATE_LIMIT_ACCOUNT_RATE: float = 0.2
+    RATE_LIMIT_ACCOUNT_BURST: int = 5
+    RATE_LIMIT_MAX_KEYS: int = 250000
+    RATE_LIMIT_SHARDS: int = 64
+    RATE_LIMIT_EVICT_INTERVAL: float = 60.0
+
+    TOKEN_MODE: Literal["session", "signed"] = "session"
+    TOKEN_SECRET: str = ""
+    ACCESS_TOKEN_TTL: int = 300
+    TOKEN_REVOCATION_SYNC_INTERVAL: float = 5.0
+
+    SESSION_BACKEND: Literal["sql", "memory", "kv"] = "sql"
+    SESSION_TTL: int = 3600
+    SESSION_MEMORY_SHARDS: int = 64
+    SESSION_KV_HOST: str = "localhost"
+    SESSION_KV_PORT: int = 6379
+    SESSION_KV_POOL_SIZE: int = 10
+    SESSION_KV_TIMEOUT: float = 5.0
+    SESSION_REFRESH_INTERVAL: float = 5.0
+    SESSION_REFRESH_QUEUE_SIZE: int = 5000
+    SESSION_REAP_INTERVAL: float = 300.0
+    SESSION_REAP_BATCH_SIZE: int = 1000
+    TMDB_API_KEY: str = ""
+    TMDB_BASE_URL: str = "https://api.themoviedb.org/3"
+    TMDB_IMAGE_URL: str = "https://image.tmdb.org/t/p/original"
+    TMDB_CONCURRENCY: int = 8
+    TMDB_RATE_LIMIT: float = 40.0
+    TMDB_CACHE_DIR: str = ".cache/tmdb"
+    TMDB_CACHE_TTL: float = 86400.0
+    INGEST_BATCH_SIZE: int = 100
+    RATING_RECONCILE_INTERVAL: float = 0.0
+    RATING_RECONCILE_BATCH_SIZE: int = 1000
 
     model_config = SettingsConfigDict(
         env_file=".env",
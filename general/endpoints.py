@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .metrics import registry
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    description="Prometheus metrics of this worker",
+    response_class=PlainTextResponse,
+)
+async def metrics() -> PlainTextResponse:
+    """
+    Render the metrics in the Prometheus text format
+    Returns:
+        PlainTextResponse: The metrics
+    """
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
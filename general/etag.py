@@ -0,0 +1,29 @@
+from datetime import datetime
+
+
+def make_etag(version: datetime) -> str:
+    """
+    Build a strong entity tag from a row version
+    Args:
+        version (datetime): The time the row was last updated
+    Returns:
+        str: The quoted entity tag
+    """
+    return f'"{version.strftime("%Y%m%d%H%M%S%f")}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an entity tag, weakly
+    Args:
+        if_none_match (str): The header value
+        etag (str): The current entity tag
+    Returns:
+        bool: Whether the client's copy is current
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
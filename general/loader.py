@@ -0,0 +1,76 @@
+import asyncio
+from contextvars import Context
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Coalesce loads issued in the same event-loop tick into batch calls.
+    Keys requested before the scheduled dispatch runs are deduplicated and
+    passed to `batch` in groups of at most `max_size`. Batches run in an
+    empty context so they do not inherit one caller's context variables.
+    """
+
+    batch: Callable[[list[K]], Awaitable[dict[K, V]]]
+    max_size: int
+    pending: dict[K, list[asyncio.Future]]
+
+    def __init__(
+        self,
+        batch: Callable[[list[K]], Awaitable[dict[K, V]]],
+        max_size: int = 100,
+    ):
+        self.batch = batch
+        self.max_size = max_size
+        self.pending = {}
+        self.tasks = set()
+        self.scheduled = False
+        self.batches = 0
+        self.loads = 0
+
+    async def load(self, key: K) -> V | None:
+        """
+        Load a value in the next batch
+        Args:
+            key (K): The key
+        Returns:
+            V | None: The value, or None if the batch did not return it
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.setdefault(key, []).append(future)
+        self.loads += 1
+        if not self.scheduled:
+            self.scheduled = True
+            loop.call_soon(self.dispatch, context=Context())
+        return await future
+
+    def dispatch(self):
+        pending, self.pending = self.pending, {}
+        self.scheduled = False
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_size):
+            chunk = keys[start:start + self.max_size]
+            group = {key: pending[key] for key in chunk}
+            task = asyncio.create_task(self.resolve(group))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def resolve(self, group: dict[K, list[asyncio.Future]]):
+        self.batches += 1
+        try:
+            values = await self.batch(list(group))
+        except Exception as e:
+            for futures in group.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for key, futures in group.items():
+            value = values.get(key)
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
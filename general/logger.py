@@ -1,8 +1,22 @@
+import atexit
+import copy
+import json
 import logging
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from random import random
+from time import monotonic
+
+from general.metrics import registry
 
 LEVEL_SPACING = 9
 NAME_SPACING = 20
 
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
 
 class Color:
     """ANSI escape codes for colors."""
@@ -33,62 +47,236 @@ def colorize(text: str, color: str) -> str:
 def format_template(
     level_format: callable,
     name_format: callable,
-    record: logging.LogRecord,
+    levelname: str,
     header: str = "",
 ) -> str:
-    """Format a log record using a template."""
+    """Build the format string of a log level."""
     format_string = ""
-    level_spacing = " " * (LEVEL_SPACING - len(record.levelname))
-    name_spacing = " " * (NAME_SPACING - len(record.name))
+    level_spacing = " " * (LEVEL_SPACING - len(levelname))
     format_string += header
     format_string += level_format("%(levelname)s") + ":" + level_spacing
-    format_string += name_format("%(name)s") + ":" + name_spacing
+    format_string += name_format("%(name)s") + ":%(name_spacing)s"
     format_string += "%(message)s"
-    formatter = logging.Formatter(format_string)
-    return formatter.format(record)
+    return format_string
 
 
-class ColorFormatter(logging.Formatter):
-    """A logging formatter that colorizes the output."""
+class TemplateFormatter(logging.Formatter, ABC):
+    """A logging formatter that builds one formatter per level, once."""
+
+    formatters: dict[str, logging.Formatter]
+
+    def __init__(self):
+        super().__init__()
+        self.formatters = {}
+
+    @abstractmethod
+    def template(self, levelname: str) -> str:
+        """Build the format string of a log level."""
 
     def format(self, record: logging.LogRecord) -> str:
-        color = DEBUG_COLORS[record.levelname]
+        formatter = self.formatters.get(record.levelname)
+        if not formatter:
+            formatter = logging.Formatter(self.template(record.levelname))
+            self.formatters[record.levelname] = formatter
+        record.name_spacing = " " * (NAME_SPACING - len(record.name))
+        return formatter.format(record)
+
+
+class ColorFormatter(TemplateFormatter):
+    """A logging formatter that colorizes the output."""
+
+    def template(self, levelname: str) -> str:
+        color = DEBUG_COLORS.get(levelname, Color.WHITE)
         return format_template(
             lambda level: colorize(level, color),
             lambda name: colorize(name, Color.GRAY),
-            record,
+            levelname,
         )
 
 
-class RegularFormatter(logging.Formatter):
+class RegularFormatter(TemplateFormatter):
     """A logging formatter that does not colorize the output."""
 
-    def format(self, record: logging.LogRecord) -> str:
+    def template(self, levelname: str) -> str:
         return format_template(
-            lambda level: level, lambda name: name, record, "%(asctime)s: "
+            lambda level: level, lambda name: name, levelname, "%(asctime)s: "
         )
 
 
+class JsonFormatter(logging.Formatter):
+    """A logging formatter that outputs one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Tag records with the id of the request they were logged in."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random fraction of the records below WARNING."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or random() < self.rate:
+            return True
+        self.suppressed += 1
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """Keep at most `rate` records per second below WARNING."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = monotonic()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        now = monotonic()
+        self.tokens = min(
+            self.rate, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.suppressed += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """A queue handler that drops records instead of blocking when full."""
+
+    def __init__(self, queue: Queue):
+        super().__init__(queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in the same process, so the record only needs
+        # its arguments merged before they can change, not a pickle-safe
+        # copy; other handlers of the logger still see the original record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except Full:
+            self.dropped += 1
+
+
+queue_handler: DroppingQueueHandler | None = None
+queue_listener: QueueListener | None = None
+
+
+log_records = registry.counter(
+    "log_records_total",
+    "Records put on the log queue by outcome",
+    ("outcome",),
+)
+
+
+@registry.collector
+def collect_log_queue_stats():
+    if queue_handler:
+        log_records.labels("enqueued").set(queue_handler.enqueued)
+        log_records.labels("dropped").set(queue_handler.dropped)
+
+
+def stop_logger():
+    """Stop the queue listener thread after writing the queued records."""
+    global queue_handler, queue_listener
+    if not queue_listener:
+        return
+    queue_listener.stop()
+    queue_handler = None
+    queue_listener = None
+
+
 def init_logger(
     level: str | int = "DEBUG",
     filename: str | None = None,
     console: bool = True,
+    queue_size: int = 0,
+    json_format: bool = False,
+    sample_rates: dict[str, float] | None = None,
+    rate_limits: dict[str, float] | None = None,
 ):
-    """Initialize the logger."""
+    """
+    Initialize the logger.
+    With a queue size, records are put on a bounded queue and written by a
+    listener thread, so that logging never blocks on console or file I/O.
+    Sample rates (fraction kept) and rate limits (records per second) are
+    applied per logger name to records below WARNING.
+    """
+    global queue_handler, queue_listener
     logger = logging.getLogger()
     logger.setLevel(logging.DEBUG)
     logging.getLogger("aiomysql").setLevel("WARNING")
     fastapi_logger = logging.getLogger("uvicorn.access")
     fastapi_logger.handlers.clear()
     fastapi_logger.setLevel(logging.DEBUG)
+    for name, rate in (sample_rates or {}).items():
+        logging.getLogger(name).addFilter(SamplingFilter(rate))
+    for name, rate in (rate_limits or {}).items():
+        logging.getLogger(name).addFilter(RateLimitFilter(rate))
+    handlers = []
     if console:
         console_handler = logging.StreamHandler()
-        console_handler.setFormatter(ColorFormatter())
+        console_handler.setFormatter(
+            JsonFormatter() if json_format else ColorFormatter()
+        )
         console_handler.setLevel(level)
-        logger.addHandler(console_handler)
-        fastapi_logger.addHandler(console_handler)
-    if not filename:
+        handlers.append(console_handler)
+    if filename:
+        file_handler = logging.FileHandler(filename)
+        file_handler.setFormatter(
+            JsonFormatter() if json_format else RegularFormatter()
+        )
+        handlers.append(file_handler)
+    if queue_size > 0 and handlers:
+        stop_logger()
+        queue_handler = DroppingQueueHandler(Queue(queue_size))
+        queue_handler.addFilter(RequestIdFilter())
+        queue_listener = QueueListener(
+            queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        queue_listener.start()
+        atexit.register(stop_logger)
+        logger.addHandler(queue_handler)
+        fastapi_logger.addHandler(queue_handler)
         return
-    file_handler = logging.FileHandler(filename)
-    file_handler.setFormatter(RegularFormatter())
-    logger.addHandler(file_handler)
+    for handler in handlers:
+        handler.addFilter(RequestIdFilter())
+        logger.addHandler(handler)
+    if console:
+        fastapi_logger.addHandler(console_handler)
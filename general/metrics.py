@@ -0,0 +1,208 @@
+"""
+Minimal Prometheus metrics.
+
+Every worker process keeps its own values and only mutates them from its
+event loop thread, so no locking is needed. Histograms use fixed buckets:
+an observation is a bisect and two additions.
+"""
+from bisect import bisect_left
+from typing import Callable
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0,
+)
+
+
+def escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Value:
+    """The value of a counter or gauge for one set of label values."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Buckets:
+    """The buckets of a histogram for one set of label values."""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Metric:
+    type = ""
+
+    name: str
+    description: str
+    label_names: tuple[str, ...]
+    children: dict[tuple, Value | Buckets]
+
+    def __init__(
+        self, name: str, description: str, label_names: tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.children = {}
+
+    def child(self) -> Value | Buckets:
+        return Value()
+
+    def labels(self, *values) -> Value | Buckets:
+        """
+        Get the value for a set of label values, creating it if needed
+        Args:
+            *values: The label values, in the order of `label_names`
+        Returns:
+            Value | Buckets: The value to update
+        """
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = self.child()
+        return child
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{format_labels(self.label_names, values)} "
+            f"{child.value}"
+            for values, child in self.children.items()
+        ]
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {escape(self.description)}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(Metric):
+    type = "counter"
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    buckets: tuple[float, ...]
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def child(self) -> Buckets:
+        return Buckets(self.buckets)
+
+    def samples(self) -> list[str]:
+        lines = []
+        names = self.label_names + ("le",)
+        for values, child in self.children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), child.counts):
+                cumulative += count
+                labels = format_labels(names, values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {child.sum}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The metrics of the process and the collectors refreshing them."""
+
+    metrics: dict[str, Metric]
+    collectors: list[Callable[[], None]]
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, description: str, label_names: tuple[str, ...] = ()
+    ) -> Counter:
+        return self.register(Counter(name, description, label_names))
+
+    def gauge(
+        self, name: str, description: str, label_names: tuple[str, ...] = ()
+    ) -> Gauge:
+        return self.register(Gauge(name, description, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(
+            Histogram(name, description, label_names, buckets)
+        )
+
+    def collector(self, func: Callable[[], None]) -> Callable[[], None]:
+        """Register a function updating metrics right before rendering."""
+        self.collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+        Returns:
+            str: The metrics
+        """
+        for collect in self.collectors:
+            collect()
+        return "\n".join(
+            metric.render() for metric in self.metrics.values()
+        ) + "\n"
+
+
+registry = Registry()
@@ -0,0 +1,94 @@
+import re
+from time import perf_counter
+from uuid import uuid4
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from general.logger import request_id
+from general.metrics import registry
+
+REQUEST_ID_HEADER = b"x-request-id"
+REQUEST_ID_PATTERN = re.compile(rb"[A-Za-z0-9._-]{1,128}")
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP requests by method, route and status",
+    ("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route",
+    ("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served",
+    ("method",),
+)
+
+
+class RequestIdMiddleware:
+    """
+    Assign every request an id, available to log records and echoed back
+    in the X-Request-ID header. A valid incoming X-Request-ID is reused so
+    that logs can be correlated across services.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        value = dict(scope["headers"]).get(REQUEST_ID_HEADER, b"")
+        if not REQUEST_ID_PATTERN.fullmatch(value):
+            value = uuid4().hex.encode()
+        # Not reset afterwards, so that the exception handlers running
+        # outside of this middleware still see it. Every request is served
+        # in its own task, and therefore its own context.
+        request_id.set(value.decode())
+
+        async def send_with_id(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER, value)
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
+
+
+class MetricsMiddleware:
+    """Record the count, status and latency of requests per route."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        in_flight = http_requests_in_flight.labels(method)
+        in_flight.inc()
+        start = perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = perf_counter() - start
+            in_flight.dec()
+            # The router stores the matched route in the scope, giving the
+            # path template rather than the path with its parameters
+            route = scope.get("route")
+            path = route.path if route else "unmatched"
+            http_requests.labels(method, path, status).inc()
+            http_request_duration.labels(method, path).observe(duration)
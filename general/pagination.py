@@ -0,0 +1,57 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodeError
+
+from fastapi import HTTPException
+
+from general.config import get_config
+
+config = get_config()
+
+
+def page_size(limit: int | None) -> int:
+    """
+    Clamp a requested page size to the server-side maximum
+    Args:
+        limit (int | None): The requested page size
+    Returns:
+        int: The page size to use
+    """
+    if not limit or limit < 1:
+        return config.PAGE_SIZE_DEFAULT
+    return min(limit, config.PAGE_SIZE_MAX)
+
+
+def encode_cursor(key: tuple) -> str:
+    """
+    Encode the sort key of the last item of a page into an opaque cursor
+    Args:
+        key (tuple): The sort key
+    Returns:
+        str: The cursor
+    """
+    data = json.dumps(list(key), separators=(",", ":")).encode()
+    return urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> tuple:
+    """
+    Decode a cursor made by `encode_cursor`
+    Args:
+        cursor (str): The cursor
+        length (int): The expected number of sort key values
+    Returns:
+        tuple: The sort key
+    """
+    try:
+        data = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(data)
+    except (DecodeError, ValueError):
+        raise HTTPException(422, "Invalid cursor")
+    if (
+        not isinstance(key, list)
+        or len(key) != length
+        or not all(isinstance(value, (int, str)) for value in key)
+    ):
+        raise HTTPException(422, "Invalid cursor")
+    return tuple(key)
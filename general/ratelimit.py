@@ -0,0 +1,79 @@
+import asyncio
+from time import monotonic
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by string, split across shards.
+    Each bucket is stored as a single float, the time at which it will be
+    full again (GCRA), under the 64-bit hash of its key. A bucket that is
+    full carries no state, so idle keys can be dropped without changing
+    behaviour. Shards bound the cost of a sweep and of forced eviction.
+    """
+
+    rate: float
+    burst: int
+    shards: list[dict[int, float]]
+
+    def __init__(
+        self, rate: float, burst: int, max_keys: int, shards: int = 64
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.interval = 1 / rate
+        self.tolerance = self.interval * (burst - 1)
+        self.shard_size = max(1, max_keys // shards)
+        self.shards = [{} for _ in range(shards)]
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def hit(self, key: str) -> float:
+        """
+        Take a token from the bucket of a key
+        Args:
+            key (str): The key
+        Returns:
+            float: 0 if the request is allowed, otherwise the number of
+                seconds until a token is available
+        """
+        digest = hash(key)
+        shard = self.shards[digest % len(self.shards)]
+        now = monotonic()
+        full_at = max(shard.pop(digest, now), now)
+        wait = full_at - now - self.tolerance
+        if wait > 0:
+            shard[digest] = full_at
+            self.rejected += 1
+            return wait
+        if len(shard) >= self.shard_size:
+            # Forget the least recently seen key of the shard
+            del shard[next(iter(shard))]
+            self.evictions += 1
+        shard[digest] = full_at + self.interval
+        self.allowed += 1
+        return 0
+
+    async def evict(self) -> int:
+        """
+        Drop the buckets that have refilled, yielding between shards
+        Returns:
+            int: The number of keys dropped
+        """
+        removed = 0
+        for shard in self.shards:
+            now = monotonic()
+            idle = [key for key, full_at in shard.items() if full_at <= now]
+            for key in idle:
+                del shard[key]
+            removed += len(idle)
+            await asyncio.sleep(0)
+        self.evictions += removed
+        return removed
+
+    def clear(self):
+        for shard in self.shards:
+            shard.clear()
@@ -0,0 +1,23 @@
+from typing import Any, Mapping
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+class ModelResponse(Response):
+    """
+    A JSON response serialized directly by a prebuilt TypeAdapter.
+    Returning a Response skips FastAPI's re-validation of the return value
+    and its jsonable_encoder pass; pydantic-core writes the bytes itself.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        adapter: TypeAdapter,
+        content: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+    ):
+        super().__init__(adapter.dump_json(content), status_code, headers)
@@ -1,5 +1,9 @@
+from typing import Generic, TypeVar
+
 from pydantic import BaseModel, Field
 
+T = TypeVar("T")
+
 
 class BasicResponse(BaseModel):
     message: str = Field("Success!", description="The message of the response")
@@ -7,3 +11,12 @@ class BasicResponse(BaseModel):
 
 class ErrorResponse(BaseModel):
     error: str = Field("Error", description="The error message")
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T] = Field(description="The items of the page")
+    next_cursor: str | None = Field(
+        None,
+        description="The cursor of the next page, absent on the last page",
+        examples=["WzEsIDUwXQ"],
+    )
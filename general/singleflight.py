@@ -0,0 +1,58 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from .cache import TTLCache
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Share one in-flight call among concurrent callers with the same key.
+    The call runs as its own task, so a caller that is cancelled does not
+    cancel it for the others. Successful results can additionally be kept
+    in a short-lived cache.
+    """
+
+    inflight: dict[K, asyncio.Task]
+    cache: TTLCache[K, V] | None
+
+    def __init__(self, cache: TTLCache[K, V] | None = None):
+        self.inflight = {}
+        self.cache = cache
+        self.executed = 0
+        self.coalesced = 0
+        self.cached = 0
+
+    async def do(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        """
+        Run a call unless an identical one is already running
+        Args:
+            key (K): The key identifying the call
+            func (Callable[[], Awaitable[V]]): The call
+        Returns:
+            V: The result, possibly shared with other callers
+        """
+        if self.cache is not None:
+            value = self.cache.get(key)
+            if value is not None:
+                self.cached += 1
+                return value
+        task = self.inflight.get(key)
+        if task:
+            self.coalesced += 1
+        else:
+            self.executed += 1
+            task = asyncio.ensure_future(func())
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self.finish(key, done))
+        return await asyncio.shield(task)
+
+    def finish(self, key: K, task: asyncio.Task):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if task.cancelled() or task.exception():
+            return
+        if self.cache is not None:
+            self.cache.set(key, task.result())
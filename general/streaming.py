@@ -0,0 +1,46 @@
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+
+
+async def ndjson(
+    chunks: AsyncIterator[list[BaseModel]],
+) -> AsyncIterator[bytes]:
+    """
+    Serialize chunks of models as newline-delimited JSON
+    Args:
+        chunks (AsyncIterator[list[BaseModel]]): The chunks to serialize
+    Returns:
+        AsyncIterator[bytes]: One block of lines per chunk
+    """
+    try:
+        async for chunk in chunks:
+            yield b"".join(
+                item.model_dump_json().encode() + b"\n" for item in chunk
+            )
+    finally:
+        await chunks.aclose()
+
+
+async def json_array(
+    chunks: AsyncIterator[list[BaseModel]],
+) -> AsyncIterator[bytes]:
+    """
+    Serialize chunks of models as a single JSON array
+    Args:
+        chunks (AsyncIterator[list[BaseModel]]): The chunks to serialize
+    Returns:
+        AsyncIterator[bytes]: The array, one block of elements per chunk
+    """
+    opening = b"["
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            yield opening + b",".join(
+                item.model_dump_json().encode() for item in chunk
+            )
+            opening = b","
+    finally:
+        await chunks.aclose()
+    yield b"[]" if opening == b"[" else b"]"
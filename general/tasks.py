@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run a coroutine function in the background at a fixed interval."""
+
+    name: str
+    interval: float
+    func: Callable[[], Awaitable]
+    task: asyncio.Task | None
+
+    def __init__(
+        self, name: str, interval: float, func: Callable[[], Awaitable]
+    ):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.task = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self):
+        """Start running the function in the current event loop."""
+        if self.running or self.interval <= 0:
+            return
+        logger.debug(f"Starting {self.name} every {self.interval}s")
+        self.task = asyncio.create_task(self.run(), name=self.name)
+
+    async def stop(self):
+        """Cancel the task and wait for it to finish."""
+        if not self.task:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.func()
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
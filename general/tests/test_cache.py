@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from general.cache import TTLCache
+
+
+def test_cache_get_and_set():
+    cache = TTLCache(maxsize=2, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cache_expiration():
+    cache = TTLCache(maxsize=2, ttl=60)
+    with patch("general.cache.monotonic", return_value=0):
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=10)
+        cache.set("c", 3, ttl=0)
+    with patch("general.cache.monotonic", return_value=30):
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") is None
+    with patch("general.cache.monotonic", return_value=60):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_invalidation():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 1)
+    assert cache.discard_if(lambda key, value: value == 1) == 2
+    assert cache.pop("b") == 2
+    assert cache.pop("b") is None
+    assert len(cache) == 0
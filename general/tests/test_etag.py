@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from general.etag import etag_matches, make_etag
+
+
+def test_make_etag():
+    version = datetime(2024, 3, 1, 12, 30, 5, 42)
+    assert make_etag(version) == '"20240301123005000042"'
+    assert make_etag(version.replace(microsecond=43)) != make_etag(version)
+
+
+def test_etag_matches():
+    etag = '"20240301123005000042"'
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches("", etag)
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from general.loader import BatchLoader
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def make_loader(max_size: int = 100):
+    calls = []
+
+    async def batch(keys: list[int]) -> dict[int, str]:
+        calls.append(keys)
+        return {key: str(key) for key in keys if key > 0}
+
+    loader = BatchLoader(batch, max_size)
+    loader.calls = calls
+    return loader
+
+
+@pytest.mark.anyio
+async def test_concurrent_loads_are_batched():
+    loader = make_loader()
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), loader.load(1), loader.load(0)
+    )
+    assert results == ["1", "2", "1", None]
+    assert loader.calls == [[1, 2, 0]]
+    assert (loader.loads, loader.batches) == (4, 1)
+
+
+@pytest.mark.anyio
+async def test_sequential_loads_are_not_batched():
+    loader = make_loader()
+    assert await loader.load(1) == "1"
+    assert await loader.load(2) == "2"
+    assert loader.calls == [[1], [2]]
+
+
+@pytest.mark.anyio
+async def test_batches_are_split():
+    loader = make_loader(max_size=2)
+    results = await asyncio.gather(*(loader.load(key) for key in (1, 2, 3)))
+    assert results == ["1", "2", "3"]
+    assert loader.calls == [[1, 2], [3]]
+
+
+@pytest.mark.anyio
+async def test_batch_errors_reach_every_caller():
+    async def batch(keys: list[int]) -> dict[int, str]:
+        raise RuntimeError("unavailable")
+
+    loader = BatchLoader(batch)
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
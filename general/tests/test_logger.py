@@ -0,0 +1,101 @@
+import json
+import logging
+from queue import Queue
+from unittest.mock import patch
+
+import pytest
+
+from general.logger import (
+    ColorFormatter,
+    DroppingQueueHandler,
+    JsonFormatter,
+    RateLimitFilter,
+    RegularFormatter,
+    RequestIdFilter,
+    SamplingFilter,
+    TemplateFormatter,
+    request_id,
+)
+
+
+def record(level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(
+        "users.methods", level, __file__, 1, "User %s", ("created",), None
+    )
+
+
+def test_regular_formatter():
+    message = RegularFormatter().format(record())
+    assert message.endswith(
+        ": INFO:     users.methods:       User created"
+    )
+
+
+def test_color_formatter_reuses_formatters():
+    formatter = ColorFormatter()
+    formatter.format(record(logging.INFO))
+    formatter.format(record(logging.INFO))
+    formatter.format(record(logging.ERROR))
+    assert set(formatter.formatters) == {"INFO", "ERROR"}
+
+
+def test_queue_handler_drops_when_full():
+    handler = DroppingQueueHandler(Queue(2))
+    for _ in range(3):
+        handler.handle(record())
+    assert handler.enqueued == 2
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().getMessage() == "User created"
+
+
+def test_queue_handler_keeps_caller_record():
+    handler = DroppingQueueHandler(Queue(1))
+    log_record = record()
+    handler.handle(log_record)
+    assert (log_record.msg, log_record.args) == ("User %s", ("created",))
+    queued = handler.queue.get_nowait()
+    assert (queued.msg, queued.args) == ("User created", None)
+
+
+def test_template_formatter_is_abstract():
+    with pytest.raises(TypeError):
+        TemplateFormatter()
+
+
+def test_json_formatter():
+    log_record = record()
+    log_record.request_id = "abc"
+    data = json.loads(JsonFormatter().format(log_record))
+    assert data["level"] == "INFO"
+    assert data["logger"] == "users.methods"
+    assert data["message"] == "User created"
+    assert data["request_id"] == "abc"
+
+
+def test_request_id_filter():
+    log_record = record()
+    token = request_id.set("abc")
+    RequestIdFilter().filter(log_record)
+    request_id.reset(token)
+    assert log_record.request_id == "abc"
+
+
+def test_sampling_filter():
+    sampling = SamplingFilter(0)
+    assert not sampling.filter(record())
+    assert sampling.filter(record(logging.WARNING))
+    assert sampling.suppressed == 1
+    assert SamplingFilter(1).filter(record())
+
+
+def test_rate_limit_filter():
+    with patch("general.logger.monotonic", return_value=0):
+        rate_limit = RateLimitFilter(2)
+        assert [rate_limit.filter(record()) for _ in range(3)] == [
+            True, True, False
+        ]
+        assert rate_limit.filter(record(logging.ERROR))
+    with patch("general.logger.monotonic", return_value=0.5):
+        assert rate_limit.filter(record())
+        assert not rate_limit.filter(record())
+    assert rate_limit.suppressed == 2
@@ -0,0 +1,77 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+
+from general.metrics import Registry
+from general.middleware import MetricsMiddleware, http_requests
+
+
+def test_counter_and_gauge():
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests", ("status",))
+    gauge = registry.gauge("in_flight", "In flight")
+    counter.labels(200).inc()
+    counter.labels(200).inc()
+    counter.labels(404).inc()
+    gauge.labels().inc()
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{status="200"} 2.0\n'
+        'requests_total{status="404"} 1.0\n'
+        "# HELP in_flight In flight\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 1.0\n"
+    )
+
+
+def test_histogram():
+    registry = Registry()
+    histogram = registry.histogram(
+        "latency_seconds", "Latency", ("route",), buckets=(0.1, 1)
+    )
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.labels('/a"b').observe(value)
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/a\\"b",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a\\"b",le="1"} 3',
+        'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a\\"b"} 2.65',
+        'latency_seconds_count{route="/a\\"b"} 4',
+    ]
+
+
+def test_registry_collectors():
+    registry = Registry()
+    gauge = registry.gauge("size", "Size")
+    registry.collector(lambda: gauge.labels().set(3))
+    assert registry.render().endswith("size 3\n")
+    with pytest.raises(ValueError):
+        registry.gauge("size", "Size")
+
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/items/{item_id}")
+async def read_item(item_id: int) -> dict:
+    return {"id": item_id}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_metrics_middleware():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="https://localhost/"
+    ) as client:
+        await client.get("/items/1")
+        await client.get("/items/2")
+        await client.get("/missing")
+    assert http_requests.labels("GET", "/items/{item_id}", 200).value == 2
+    assert http_requests.labels("GET", "unmatched", 404).value == 1
@@ -0,0 +1,46 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+
+from general.logger import request_id
+from general.middleware import RequestIdMiddleware
+
+app = FastAPI()
+app.add_middleware(RequestIdMiddleware)
+
+
+@app.get("/")
+async def read_request_id() -> dict:
+    return {"request_id": request_id.get()}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="function")
+async def async_client() -> AsyncClient:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="https://localhost/"
+    ) as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_request_id_generated(async_client: AsyncClient):
+    response = await async_client.get("/")
+    assert len(response.headers["x-request-id"]) == 32
+    assert response.json() == {
+        "request_id": response.headers["x-request-id"]
+    }
+
+
+@pytest.mark.anyio
+async def test_request_id_reused(async_client: AsyncClient):
+    response = await async_client.get("/", headers={"X-Request-ID": "abc-1"})
+    assert response.headers["x-request-id"] == "abc-1"
+    assert response.json() == {"request_id": "abc-1"}
+    response = await async_client.get("/", headers={"X-Request-ID": "a b"})
+    assert response.headers["x-request-id"] != "a b"
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+import pytest
+
+from general.ratelimit import RateLimiter
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_burst_then_reject():
+    limiter = RateLimiter(rate=1, burst=3, max_keys=10, shards=2)
+    with patch("general.ratelimit.monotonic", return_value=100.0):
+        assert [limiter.hit("a") for _ in range(3)] == [0, 0, 0]
+        assert limiter.hit("a") == pytest.approx(1.0)
+        assert limiter.hit("b") == 0
+    assert limiter.allowed == 4
+    assert limiter.rejected == 1
+
+
+def test_tokens_refill():
+    limiter = RateLimiter(rate=2, burst=1, max_keys=10, shards=2)
+    with patch("general.ratelimit.monotonic", return_value=100.0):
+        assert limiter.hit("a") == 0
+        assert limiter.hit("a") == pytest.approx(0.5)
+    with patch("general.ratelimit.monotonic", return_value=100.5):
+        assert limiter.hit("a") == 0
+
+
+def test_keys_are_bounded():
+    limiter = RateLimiter(rate=1, burst=1, max_keys=4, shards=1)
+    with patch("general.ratelimit.monotonic", return_value=100.0):
+        for key in "abcdef":
+            assert limiter.hit(key) == 0
+        assert len(limiter) == 4
+        assert limiter.evictions == 2
+        # The least recently seen keys were forgotten
+        assert limiter.hit("a") == 0
+        assert limiter.hit("f") > 0
+
+
+@pytest.mark.anyio
+async def test_evict_idle_keys():
+    limiter = RateLimiter(rate=1, burst=2, max_keys=10, shards=2)
+    with patch("general.ratelimit.monotonic", return_value=100.0):
+        limiter.hit("a")
+        limiter.hit("b")
+        limiter.hit("b")
+    with patch("general.ratelimit.monotonic", return_value=101.5):
+        assert await limiter.evict() == 1
+        assert len(limiter) == 1
+        assert limiter.hit("b") == 0
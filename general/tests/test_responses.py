@@ -0,0 +1,25 @@
+import json
+
+from pydantic import BaseModel, TypeAdapter
+
+from general.responses import ModelResponse
+from general.schemas import Page
+
+
+class Item(BaseModel):
+    id: int
+    name: str | None = None
+
+
+def test_model_response():
+    adapter = TypeAdapter(Page[Item])
+    page = Page[Item](items=[Item(id=1, name="a"), Item(id=2)])
+    response = ModelResponse(adapter, page, headers={"X-Test": "1"})
+    assert response.status_code == 200
+    assert response.media_type == "application/json"
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["x-test"] == "1"
+    assert json.loads(response.body) == {
+        "items": [{"id": 1, "name": "a"}, {"id": 2, "name": None}],
+        "next_cursor": None,
+    }
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from general.cache import TTLCache
+from general.singleflight import SingleFlight
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def counting(result="value", error: Exception | None = None):
+    calls = []
+
+    async def func():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if error:
+            raise error
+        return result
+
+    return func, calls
+
+
+@pytest.mark.anyio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    func, calls = counting()
+    results = await asyncio.gather(*(flight.do("a", func) for _ in range(5)))
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert (flight.executed, flight.coalesced) == (1, 4)
+    assert not flight.inflight
+    await flight.do("a", func)
+    assert len(calls) == 2
+
+
+@pytest.mark.anyio
+async def test_errors_are_shared():
+    flight = SingleFlight()
+    func, calls = counting(error=ValueError("failed"))
+    results = await asyncio.gather(
+        flight.do("a", func), flight.do("a", func), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight()
+    func, calls = counting()
+    first = asyncio.create_task(flight.do("a", func))
+    second = asyncio.create_task(flight.do("a", func))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "value"
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_results_are_cached():
+    flight = SingleFlight(TTLCache(maxsize=10, ttl=60))
+    func, calls = counting()
+    assert await flight.do("a", func) == "value"
+    assert await flight.do("a", func) == "value"
+    assert len(calls) == 1
+    assert flight.cached == 1
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from general.streaming import json_array, ndjson
+
+
+class Item(BaseModel):
+    id: int
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def chunks(*sizes: int):
+    start = 0
+    for size in sizes:
+        yield [Item(id=i) for i in range(start, start + size)]
+        start += size
+
+
+async def collect(body) -> bytes:
+    return b"".join([block async for block in body])
+
+
+@pytest.mark.anyio
+async def test_ndjson():
+    body = await collect(ndjson(chunks(2, 1)))
+    assert body == b'{"id":0}\n{"id":1}\n{"id":2}\n'
+
+
+@pytest.mark.anyio
+async def test_json_array():
+    body = await collect(json_array(chunks(2, 0, 1)))
+    assert json.loads(body) == [{"id": 0}, {"id": 1}, {"id": 2}]
+    assert await collect(json_array(chunks())) == b"[]"
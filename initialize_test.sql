@@ -1,4 +1,8 @@
 USE `ace-of-spades`;
+DROP TABLE IF EXISTS `schema_migrations`;
+DROP TABLE IF EXISTS `user_trigram`;
+DROP TABLE IF EXISTS `token_revocation`;
+DROP TABLE IF EXISTS `rating`;
 DROP TABLE IF EXISTS `comment`;
 DROP TABLE IF EXISTS `session`;
 DROP TABLE IF EXISTS `movie`;
@@ -0,0 +1,68 @@
+import asyncio
+import json
+from hashlib import sha256
+from pathlib import Path
+from time import time
+from uuid import uuid4
+
+
+class DiskCache:
+    """
+    JSON responses cached as one file per key with a TTL.
+    File access runs in a worker thread to keep the event loop free.
+    """
+
+    directory: Path
+    ttl: float
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str) -> Path:
+        digest = sha256(key.encode()).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    async def get(self, key: str) -> dict | None:
+        """
+        Get a cached value
+        Args:
+            key (str): The key
+        Returns:
+            dict | None: The value, or None if missing or expired
+        """
+        value = None
+        if self.ttl > 0:
+            value = await asyncio.to_thread(self.read, self.path(key))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: dict):
+        """
+        Cache a value
+        Args:
+            key (str): The key
+            value (dict): The JSON-serializable value
+        """
+        if self.ttl > 0:
+            await asyncio.to_thread(self.write, self.path(key), value)
+
+    def read(self, path: Path) -> dict | None:
+        try:
+            if path.stat().st_mtime + self.ttl <= time():
+                return None
+            return json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def write(self, path: Path, value: dict):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial file
+        temporary = path.with_suffix(f".{uuid4().hex}.tmp")
+        temporary.write_text(json.dumps(value))
+        temporary.replace(path)
@@ -0,0 +1,83 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Cookie
+
+from general.responses import ModelResponse
+from general.schemas import BasicResponse, ErrorResponse
+from users.methods import User
+
+from .methods import Movie
+from .schemas import MovieReadResponse, RatingRequest, movie_adapter
+
+router = APIRouter(prefix="/movies", tags=["Movie"])
+
+
+@router.get(
+    "/{movie_id}",
+    description="Read a movie",
+    responses={
+        200: {"model": MovieReadResponse},
+        404: {"model": ErrorResponse},
+    },
+)
+async def movie_read(movie_id: int) -> MovieReadResponse:
+    """
+    Retrieve a movie and its ratings
+    Args:
+        movie_id (int): The id of the movie
+    Returns:
+        MovieReadResponse: The movie
+    """
+    return ModelResponse(movie_adapter, await Movie.read(movie_id))
+
+
+@router.put(
+    "/{movie_id}/rating",
+    description="Rate a movie",
+    responses={
+        200: {"model": BasicResponse},
+        401: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+    },
+)
+async def movie_rate(
+    movie_id: int,
+    rating: RatingRequest,
+    token: Annotated[str | None, Cookie()] = None,
+) -> BasicResponse:
+    """
+    Set the rating of the current user
+    Args:
+        movie_id (int): The id of the movie
+        rating (RatingRequest): The rating
+    Returns:
+        BasicResponse: The response
+    """
+    auth = await User.authorize(token)
+    await Movie.rate(movie_id, auth.id, rating.score)
+    return {"message": "Rating saved"}
+
+
+@router.delete(
+    "/{movie_id}/rating",
+    description="Remove the rating of a movie",
+    responses={
+        200: {"model": BasicResponse},
+        401: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+    },
+)
+async def movie_unrate(
+    movie_id: int, token: Annotated[str | None, Cookie()] = None
+) -> BasicResponse:
+    """
+    Remove the rating of the current user
+    Args:
+        movie_id (int): The id of the movie
+    Returns:
+        BasicResponse: The response
+    """
+    auth = await User.authorize(token)
+    await Movie.unrate(movie_id, auth.id)
+    return {"message": "Rating deleted"}
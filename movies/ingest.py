@@ -0,0 +1,169 @@
+"""
+Ingest movies from TMDB into the movie table.
+
+Usage: python -m movies.ingest [--pages N] [--ids ID ...]
+"""
+import argparse
+import asyncio
+import logging
+from time import perf_counter
+from typing import Awaitable, Callable
+
+import httpx
+
+from database.mariadb.connection import Connection
+from general.config import get_config
+
+from .schemas import IngestStats, MovieRecord
+from .tmdb import TMDBClient, TMDBError, create_client
+
+logger = logging.getLogger(__name__)
+config = get_config()
+
+UPSERT = (
+    "INSERT INTO movie (tmdb_id, title, description, year, runtime, genres, "
+    "director, poster, background, imdb_rating, tmdb_rating, ace_rating, "
+    "ace_user_rating) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 0, %s, 0, 0) "
+    "ON DUPLICATE KEY UPDATE title = VALUES(title), "
+    "description = VALUES(description), year = VALUES(year), "
+    "runtime = VALUES(runtime), genres = VALUES(genres), "
+    "director = VALUES(director), poster = VALUES(poster), "
+    "background = VALUES(background), tmdb_rating = VALUES(tmdb_rating)"
+)
+
+DONE = None
+
+
+async def write_movies(records: list[MovieRecord]):
+    """
+    Upsert movies by TMDB id in one batched statement
+    Args:
+        records (list[MovieRecord]): The movies
+    """
+    async with Connection() as conn:
+        cursor = await conn.cursor()
+        await cursor.executemany(
+            UPSERT,
+            [
+                (
+                    record.tmdb_id,
+                    record.title,
+                    record.description,
+                    record.year,
+                    record.runtime,
+                    record.genres,
+                    record.director,
+                    record.poster,
+                    record.background,
+                    record.tmdb_rating,
+                )
+                for record in records
+            ],
+        )
+
+
+class Ingest:
+    """
+    A fetch-and-write pipeline: `concurrency` workers fetch movies from
+    TMDB while a single writer upserts them in batches, so database writes
+    overlap with network I/O.
+    """
+
+    client: TMDBClient
+    write: Callable[[list[MovieRecord]], Awaitable]
+
+    def __init__(
+        self,
+        client: TMDBClient,
+        batch_size: int,
+        write: Callable[[list[MovieRecord]], Awaitable] = write_movies,
+    ):
+        self.client = client
+        self.batch_size = batch_size
+        self.write = write
+        self.ids = asyncio.Queue()
+        self.records = asyncio.Queue(maxsize=batch_size * 2)
+        self.stats = IngestStats()
+
+    async def run(self, tmdb_ids: list[int]) -> IngestStats:
+        """
+        Fetch and store movies
+        Args:
+            tmdb_ids (list[int]): The TMDB ids
+        Returns:
+            IngestStats: The counts and throughput of the ingest
+        """
+        start = perf_counter()
+        for tmdb_id in dict.fromkeys(tmdb_ids):
+            self.ids.put_nowait(tmdb_id)
+        try:
+            # A failing writer cancels the fetchers instead of leaving them
+            # blocked on the full records queue
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self.writer())
+                group.create_task(self.fetch())
+        except ExceptionGroup as e:
+            raise e.exceptions[0]
+        self.stats.requests = self.client.requests
+        self.stats.cache_hits = self.client.cache.hits
+        self.stats.seconds = perf_counter() - start
+        logger.info(
+            f"Ingested {self.stats.movies} movies in "
+            f"{self.stats.seconds:.1f}s ({self.stats.rate:.1f} movies/s)"
+        )
+        return self.stats
+
+    async def fetch(self):
+        await asyncio.gather(
+            *(self.fetcher() for _ in range(config.TMDB_CONCURRENCY))
+        )
+        await self.records.put(DONE)
+
+    async def fetcher(self):
+        while not self.ids.empty():
+            tmdb_id = self.ids.get_nowait()
+            try:
+                data = await self.client.movie(tmdb_id)
+                record = MovieRecord.from_tmdb(data, config.TMDB_IMAGE_URL)
+            except (TMDBError, httpx.HTTPError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping TMDB movie {tmdb_id}: {e}")
+                self.stats.failed += 1
+                continue
+            await self.records.put(record)
+
+    async def writer(self):
+        batch = []
+        while (record := await self.records.get()) is not DONE:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                await self.flush(batch)
+                batch = []
+        if batch:
+            await self.flush(batch)
+
+    async def flush(self, batch: list[MovieRecord]):
+        await self.write(batch)
+        self.stats.movies += len(batch)
+
+
+async def main(pages: int, tmdb_ids: list[int]) -> IngestStats:
+    await Connection.open_pool()
+    try:
+        async with create_client() as client:
+            for page in range(1, pages + 1):
+                tmdb_ids += await client.popular(page)
+            return await Ingest(client, config.INGEST_BATCH_SIZE).run(
+                tmdb_ids
+            )
+    finally:
+        await Connection.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--ids", type=int, nargs="*", default=[])
+    args = parser.parse_args()
+    stats = asyncio.run(main(args.pages, args.ids))
+    print(stats.model_dump_json(), f"{stats.rate:.1f} movies/s")
@@ -0,0 +1,86 @@
+from aiomysql import IntegrityError
+from fastapi import HTTPException
+
+from database.mariadb.batch import execute_batch
+from database.mariadb.connection import Connection
+
+from .ratings import rate_statements, unrate_statements
+from .schemas import MovieReadResponse
+
+MOVIE_COLUMNS = (
+    "id",
+    "tmdb_id",
+    "title",
+    "description",
+    "year",
+    "runtime",
+    "genres",
+    "director",
+    "poster",
+    "background",
+    "imdb_rating",
+    "tmdb_rating",
+    "ace_rating",
+    "ace_user_rating",
+    "ace_user_rating_count",
+)
+
+
+class Movie:
+    @staticmethod
+    async def read(movie_id: int) -> MovieReadResponse:
+        """
+        Read a movie along with its rating aggregates
+        Args:
+            movie_id (int): The movie id
+        Returns:
+            MovieReadResponse: The movie
+        """
+        async with Connection(read_only=True) as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                f"SELECT {', '.join(MOVIE_COLUMNS)} FROM movie WHERE id = %s",
+                (movie_id,),
+            )
+            row = await cursor.fetchone()
+        if not row:
+            raise HTTPException(404, "Movie not found")
+        return MovieReadResponse.model_validate(dict(zip(MOVIE_COLUMNS, row)))
+
+    @staticmethod
+    async def rate(movie_id: int, user_id: int, score: int):
+        """
+        Set the rating of a user, adjusting the aggregates of the movie
+        Args:
+            movie_id (int): The movie id
+            user_id (int): The user id
+            score (int): The score
+        """
+        async with Connection(multi=True) as conn:
+            cursor = await conn.cursor()
+            try:
+                await execute_batch(
+                    cursor,
+                    rate_statements(movie_id, user_id, score),
+                    transaction=True,
+                )
+            except IntegrityError as e:
+                if "rating_movie_fk" in e.args[1]:
+                    raise HTTPException(404, "Movie not found")
+                raise
+
+    @staticmethod
+    async def unrate(movie_id: int, user_id: int):
+        """
+        Remove the rating of a user, adjusting the aggregates of the movie
+        Args:
+            movie_id (int): The movie id
+            user_id (int): The user id
+        """
+        async with Connection(multi=True) as conn:
+            cursor = await conn.cursor()
+            results = await execute_batch(
+                cursor, unrate_statements(movie_id, user_id), transaction=True
+            )
+        if results[-2].rowcount == 0:
+            raise HTTPException(404, "Rating not found")
@@ -0,0 +1,107 @@
+from database.mariadb.batch import Statement
+
+# MariaDB applies the assignments of a single-table UPDATE left to right,
+# so ace_user_rating is computed from the sum and count just assigned.
+
+
+def rate_statements(
+    movie_id: int, user_id: int, score: int
+) -> list[Statement]:
+    """
+    Build the statements that set a rating and adjust the aggregates
+    Args:
+        movie_id (int): The movie id
+        user_id (int): The user id
+        score (int): The score
+    Returns:
+        list[Statement]: The statements, to run in a transaction
+    """
+    return [
+        (
+            "SET @movie_id = %s, @user_id = %s, @score = %s",
+            (movie_id, user_id, score),
+        ),
+        # Serializes the writes of a movie's aggregates
+        ("SELECT id FROM movie WHERE id = @movie_id FOR UPDATE", ()),
+        (
+            "SET @old = (SELECT score FROM rating "
+            "WHERE movie_id = @movie_id AND user_id = @user_id)",
+            (),
+        ),
+        (
+            "INSERT INTO rating "
+            "(movie_id, user_id, score, created_at, updated_at) "
+            "VALUES (@movie_id, @user_id, @score, NOW(), NOW()) "
+            "ON DUPLICATE KEY UPDATE score = VALUES(score), "
+            "updated_at = NOW()",
+            (),
+        ),
+        (
+            "UPDATE movie SET "
+            "ace_user_rating_sum = "
+            "ace_user_rating_sum + @score - IFNULL(@old, 0), "
+            "ace_user_rating_count = "
+            "ace_user_rating_count + (@old IS NULL), "
+            "ace_user_rating = ace_user_rating_sum / ace_user_rating_count "
+            "WHERE id = @movie_id",
+            (),
+        ),
+    ]
+
+
+def unrate_statements(movie_id: int, user_id: int) -> list[Statement]:
+    """
+    Build the statements that remove a rating and adjust the aggregates
+    Args:
+        movie_id (int): The movie id
+        user_id (int): The user id
+    Returns:
+        list[Statement]: The statements, to run in a transaction; the
+            second to last deletes the rating
+    """
+    return [
+        ("SET @movie_id = %s, @user_id = %s", (movie_id, user_id)),
+        ("SELECT id FROM movie WHERE id = @movie_id FOR UPDATE", ()),
+        (
+            "SET @old = (SELECT score FROM rating "
+            "WHERE movie_id = @movie_id AND user_id = @user_id)",
+            (),
+        ),
+        (
+            "DELETE FROM rating "
+            "WHERE movie_id = @movie_id AND user_id = @user_id",
+            (),
+        ),
+        (
+            "UPDATE movie SET "
+            "ace_user_rating_sum = ace_user_rating_sum - @old, "
+            "ace_user_rating_count = ace_user_rating_count - 1, "
+            "ace_user_rating = IF(ace_user_rating_count > 0, "
+            "ace_user_rating_sum / ace_user_rating_count, 0) "
+            "WHERE id = @movie_id AND @old IS NOT NULL",
+            (),
+        ),
+    ]
+
+
+def reconcile_statement(first_id: int, last_id: int) -> Statement:
+    """
+    Build the statement that recomputes the aggregates of a range of movies
+    Args:
+        first_id (int): The first movie id of the range
+        last_id (int): The last movie id of the range
+    Returns:
+        Statement: The statement
+    """
+    return (
+        "UPDATE movie LEFT JOIN ("
+        "SELECT movie_id, SUM(score) AS total, COUNT(*) AS ratings "
+        "FROM rating WHERE movie_id BETWEEN %s AND %s GROUP BY movie_id"
+        ") AS aggregate ON aggregate.movie_id = movie.id SET "
+        "movie.ace_user_rating_sum = IFNULL(aggregate.total, 0), "
+        "movie.ace_user_rating_count = IFNULL(aggregate.ratings, 0), "
+        "movie.ace_user_rating = "
+        "IFNULL(aggregate.total / aggregate.ratings, 0) "
+        "WHERE movie.id BETWEEN %s AND %s",
+        (first_id, last_id, first_id, last_id),
+    )
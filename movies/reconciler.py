@@ -0,0 +1,119 @@
+"""
+Rebuild the rating aggregates of every movie from the ratings.
+
+Usage: python -m movies.reconciler
+"""
+import asyncio
+import logging
+from time import perf_counter
+
+from database.mariadb.connection import Connection
+from general.config import get_config
+from general.metrics import registry
+from general.tasks import PeriodicTask
+
+from .ratings import reconcile_statement
+
+logger = logging.getLogger(__name__)
+config = get_config()
+
+LOCK_NAME = "rating_reconciler"
+
+
+class RatingReconciler:
+    """
+    Periodically rebuild the rating aggregates of every movie from the
+    ratings, one range of movie ids per statement to bound lock times.
+    A named lock keeps API workers and scheduled runs from rebuilding at
+    the same time; a run finding it taken is skipped.
+    """
+
+    batch_size: int
+    task: PeriodicTask
+
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.task = PeriodicTask(
+            "rating reconciler", interval, self.reconcile
+        )
+        self.runs = 0
+        self.skipped = 0
+        self.corrected_total = 0
+        self.last_corrected = 0
+        self.last_duration = 0.0
+
+    def start(self):
+        self.task.start()
+
+    async def stop(self):
+        await self.task.stop()
+
+    async def reconcile(self) -> int | None:
+        """
+        Recompute the rating aggregates of every movie
+        Returns:
+            int | None: The number of movies whose aggregates had drifted,
+                or None if another run holds the lock
+        """
+        start = perf_counter()
+        corrected = 0
+        async with Connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+            if not (await cursor.fetchone())[0]:
+                self.skipped += 1
+                logger.debug("Rating reconciliation already running")
+                return None
+            try:
+                await cursor.execute("SELECT IFNULL(MAX(id), 0) FROM movie")
+                (last_id,) = await cursor.fetchone()
+                for first_id in range(1, last_id + 1, self.batch_size):
+                    await cursor.execute(
+                        *reconcile_statement(
+                            first_id, first_id + self.batch_size - 1
+                        )
+                    )
+                    # Only rows whose values changed are counted
+                    corrected += cursor.rowcount
+            finally:
+                await cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                await cursor.fetchone()
+        self.runs += 1
+        self.corrected_total += corrected
+        self.last_corrected = corrected
+        self.last_duration = perf_counter() - start
+        if corrected:
+            logger.warning(
+                f"Corrected the rating aggregates of {corrected} movies "
+                f"in {self.last_duration:.3f}s"
+            )
+        return corrected
+
+
+rating_reconciler = RatingReconciler(
+    config.RATING_RECONCILE_BATCH_SIZE, config.RATING_RECONCILE_INTERVAL
+)
+
+ratings_reconciled = registry.counter(
+    "rating_aggregates_corrected_total",
+    "Movies whose rating aggregates were corrected by the reconciler",
+)
+rating_reconcile_duration = registry.gauge(
+    "rating_reconcile_duration_seconds", "Duration of the last reconciler run"
+)
+
+
+@registry.collector
+def collect_reconciler_stats():
+    ratings_reconciled.labels().set(rating_reconciler.corrected_total)
+    rating_reconcile_duration.labels().set(rating_reconciler.last_duration)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    reconciler = RatingReconciler(config.RATING_RECONCILE_BATCH_SIZE, 0)
+    corrected = asyncio.run(reconciler.reconcile())
+    if corrected is None:
+        print("Another reconciliation is running")
+    else:
+        print(f"Corrected the rating aggregates of {corrected} movies")
@@ -0,0 +1,107 @@
+from pydantic import BaseModel, Field, TypeAdapter
+
+# The length of the movie columns still stored as VARCHAR(255); strict
+# mode would fail the whole batched insert on a longer value
+VARCHAR_LENGTH = 255
+
+
+class MovieRecord(BaseModel):
+    tmdb_id: int = Field(description="The TMDB id of the movie")
+    title: str = Field(description="The title of the movie")
+    description: str = Field(description="The overview of the movie")
+    year: int = Field(description="The release year")
+    runtime: int = Field(description="The runtime in minutes")
+    genres: str = Field(description="The comma-separated genres")
+    director: str = Field(description="The comma-separated directors")
+    poster: str = Field(description="The poster URL")
+    background: str = Field(description="The backdrop URL")
+    tmdb_rating: float = Field(description="The TMDB vote average")
+
+    @classmethod
+    def from_tmdb(cls, data: dict, image_url: str) -> "MovieRecord":
+        """
+        Map a TMDB movie with credits to a row of the movie table
+        Args:
+            data (dict): The TMDB response
+            image_url (str): The base URL of TMDB images
+        Returns:
+            MovieRecord: The record
+        """
+        crew = data.get("credits", {}).get("crew", [])
+        release_date = data.get("release_date") or ""
+        return cls(
+            tmdb_id=data["id"],
+            title=data["title"][:VARCHAR_LENGTH],
+            description=data.get("overview") or "",
+            year=int(release_date[:4]) if release_date[:4].isdigit() else 0,
+            runtime=data.get("runtime") or 0,
+            genres=", ".join(
+                genre["name"] for genre in data.get("genres", [])
+            ),
+            director=", ".join(
+                member["name"] for member in crew
+                if member.get("job") == "Director"
+            ),
+            poster=image(image_url, data.get("poster_path")),
+            background=image(image_url, data.get("backdrop_path")),
+            tmdb_rating=data.get("vote_average") or 0.0,
+        )
+
+
+class IngestStats(BaseModel):
+    movies: int = Field(0, description="Movies written")
+    failed: int = Field(0, description="Movies that could not be fetched")
+    requests: int = Field(0, description="Requests sent to TMDB")
+    cache_hits: int = Field(0, description="Responses served from cache")
+    seconds: float = Field(0.0, description="Duration of the ingest")
+
+    @property
+    def rate(self) -> float:
+        return self.movies / self.seconds if self.seconds else 0.0
+
+
+class MovieReadResponse(BaseModel):
+    id: int = Field(description="The id of the movie", examples=[1])
+    tmdb_id: int | None = Field(
+        None, description="The TMDB id of the movie", examples=[550]
+    )
+    title: str = Field(
+        description="The title of the movie", examples=["Fight Club"]
+    )
+    description: str = Field(description="The overview of the movie")
+    year: int = Field(description="The release year", examples=[1999])
+    runtime: int = Field(description="The runtime in minutes", examples=[139])
+    genres: str = Field(
+        description="The comma-separated genres", examples=["Drama"]
+    )
+    director: str = Field(
+        description="The comma-separated directors",
+        examples=["David Fincher"],
+    )
+    poster: str = Field(description="The poster URL")
+    background: str = Field(description="The backdrop URL")
+    imdb_rating: float = Field(description="The IMDb rating")
+    tmdb_rating: float = Field(description="The TMDB vote average")
+    ace_rating: float = Field(description="The Ace of Spades rating")
+    ace_user_rating: float = Field(
+        description="The average rating of users", examples=[8.5]
+    )
+    ace_user_rating_count: int = Field(
+        description="The number of user ratings", examples=[12]
+    )
+
+
+class RatingRequest(BaseModel):
+    score: int = Field(
+        ge=1, le=10, description="The score from 1 to 10", examples=[8]
+    )
+
+
+# Built once: creating a TypeAdapter compiles a pydantic-core schema
+movie_adapter = TypeAdapter(MovieReadResponse)
+
+
+def image(base_url: str, path: str | None) -> str:
+    url = f"{base_url}{path}" if path else ""
+    # A clipped URL would be broken, so an overlong one is dropped
+    return url if len(url) <= VARCHAR_LENGTH else ""
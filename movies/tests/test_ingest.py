@@ -0,0 +1,210 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from movies.cache import DiskCache
+from movies.ingest import Ingest
+from movies.schemas import MovieRecord
+from movies.tmdb import TMDBClient, TMDBError
+
+MOVIES = {
+    550: {
+        "id": 550,
+        "title": "Fight Club",
+        "overview": "An insomniac office worker...",
+        "release_date": "1999-10-15",
+        "runtime": 139,
+        "genres": [{"id": 18, "name": "Drama"}],
+        "poster_path": "/poster.jpg",
+        "backdrop_path": None,
+        "vote_average": 8.4,
+        "credits": {
+            "crew": [
+                {"name": "David Fincher", "job": "Director"},
+                {"name": "Jim Uhls", "job": "Screenplay"},
+            ]
+        },
+    },
+    603: {
+        "id": 603,
+        "title": "The Matrix",
+        "overview": "",
+        "release_date": "",
+        "runtime": None,
+        "genres": [
+            {"id": 28, "name": "Action"},
+            {"id": 878, "name": "Science Fiction"},
+        ],
+        "poster_path": None,
+        "backdrop_path": "/backdrop.jpg",
+        "vote_average": 8.2,
+        "credits": {"crew": []},
+    },
+}
+
+
+def fake_tmdb() -> tuple[FastAPI, dict]:
+    app = FastAPI()
+    calls = {"requests": 0, "throttled": 0}
+
+    @app.get("/movie/popular")
+    async def popular(page: int, api_key: str):
+        calls["requests"] += 1
+        return {"page": page, "results": [{"id": id} for id in MOVIES]}
+
+    @app.get("/movie/{tmdb_id}")
+    async def movie(
+        tmdb_id: int, api_key: str, append_to_response: str = Query("")
+    ):
+        calls["requests"] += 1
+        if tmdb_id == 429 and not calls["throttled"]:
+            calls["throttled"] += 1
+            return JSONResponse({}, 429, headers={"Retry-After": "0"})
+        if tmdb_id not in MOVIES or append_to_response != "credits":
+            raise HTTPException(404)
+        return MOVIES[tmdb_id]
+
+    return app, calls
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def tmdb(tmp_path):
+    app, calls = fake_tmdb()
+    client = TMDBClient(
+        "key",
+        "http://tmdb",
+        concurrency=4,
+        rate=1000,
+        cache=DiskCache(str(tmp_path), ttl=60),
+        retries=1,
+        transport=httpx.ASGITransport(app=app),
+    )
+    return client, calls
+
+
+def test_record_from_tmdb():
+    record = MovieRecord.from_tmdb(MOVIES[550], "https://img")
+    assert record.tmdb_id == 550
+    assert record.year == 1999
+    assert record.director == "David Fincher"
+    assert record.genres == "Drama"
+    assert record.poster == "https://img/poster.jpg"
+    assert record.background == ""
+    assert record.tmdb_rating == 8.4
+    record = MovieRecord.from_tmdb(MOVIES[603], "https://img")
+    assert record.year == 0
+    assert record.runtime == 0
+    assert record.director == ""
+    assert record.genres == "Action, Science Fiction"
+
+
+def test_record_fits_varchar_columns():
+    data = {
+        **MOVIES[550],
+        "title": "T" * 300,
+        "poster_path": "/" + "p" * 300,
+        "credits": {
+            "crew": [{"name": "D" * 100, "job": "Director"}] * 5
+        },
+    }
+    record = MovieRecord.from_tmdb(data, "https://img")
+    assert len(record.title) == 255
+    assert record.poster == ""
+    # Directors and genres are TEXT columns and are kept whole
+    assert len(record.director) == 5 * 100 + 4 * 2
+
+
+@pytest.mark.anyio
+async def test_client_caches_responses(tmdb):
+    client, calls = tmdb
+    async with client:
+        assert await client.popular(1) == [550, 603]
+        assert (await client.movie(550))["title"] == "Fight Club"
+        assert await client.popular(1) == [550, 603]
+        assert (await client.movie(550))["title"] == "Fight Club"
+    assert calls["requests"] == 2
+    assert client.requests == 2
+    assert client.cache.hits == 2
+
+
+@pytest.mark.anyio
+async def test_client_retries_throttled_requests(tmdb):
+    client, calls = tmdb
+    async with client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.movie(429)
+    assert calls["throttled"] == 1
+    assert client.requests == 2
+
+
+@pytest.mark.anyio
+async def test_client_gives_up(tmp_path):
+    app = FastAPI()
+
+    @app.get("/movie/{tmdb_id}")
+    async def movie(tmdb_id: int):
+        return JSONResponse({}, 503, headers={"Retry-After": "0"})
+
+    client = TMDBClient(
+        "key",
+        "http://tmdb",
+        concurrency=1,
+        rate=1000,
+        cache=DiskCache(str(tmp_path), ttl=60),
+        retries=1,
+        transport=httpx.ASGITransport(app=app),
+    )
+    async with client:
+        with pytest.raises(TMDBError):
+            await client.movie(550)
+
+
+@pytest.mark.anyio
+async def test_ingest_pipeline(tmdb):
+    client, _ = tmdb
+    batches = []
+
+    async def write(records):
+        batches.append([record.tmdb_id for record in records])
+
+    async with client:
+        stats = await Ingest(client, batch_size=1, write=write).run(
+            [550, 603, 550, 404]
+        )
+        assert sorted(sum(batches, [])) == [550, 603]
+        assert all(len(batch) == 1 for batch in batches)
+        assert stats.movies == 2
+        assert stats.failed == 1
+        assert stats.requests == 3
+
+        batches.clear()
+        stats = await Ingest(client, batch_size=10, write=write).run(
+            [550, 603]
+        )
+        assert sorted(sum(batches, [])) == [550, 603]
+        assert len(batches) == 1
+        assert stats.cache_hits == 2
+
+
+@pytest.mark.anyio
+async def test_ingest_writer_failure(tmdb, monkeypatch):
+    client, _ = tmdb
+
+    async def movie(tmdb_id):
+        return {**MOVIES[550], "id": tmdb_id}
+
+    async def write(records):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(client, "movie", movie)
+    ingest = Ingest(client, batch_size=1, write=write)
+    with pytest.raises(RuntimeError, match="database unavailable"):
+        await asyncio.wait_for(ingest.run(list(range(1, 100))), 5)
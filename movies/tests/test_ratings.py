@@ -0,0 +1,207 @@
+import pytest
+
+from aiomysql import IntegrityError
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from api import app
+from database.mariadb.connection import Connection
+from database.mariadb.migrate import migrate
+from movies import methods
+from movies.methods import Movie
+from movies.ratings import rate_statements, unrate_statements
+from movies.reconciler import LOCK_NAME, RatingReconciler
+from users.methods import User
+from users.schemas import UserLoginRequest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="function")
+async def prepare_db():
+    async with Connection() as con:
+        cur = await con.cursor()
+        with open("initialize_test.sql", "r") as sql_file:
+            sql_statements = sql_file.read()
+        queries = sql_statements.split(";")
+        for query in queries:
+            if not query.strip():
+                continue
+            await cur.execute(query)
+    await migrate()
+    async with Connection() as con:
+        cur = await con.cursor()
+        await cur.executemany(
+            "INSERT INTO movie (title, description, year, runtime, genres, "
+            "director, poster, background, imdb_rating, tmdb_rating, "
+            "ace_rating, ace_user_rating) "
+            "VALUES (%s, '', 1999, 120, '', '', '', '', 0, 0, 0, 0)",
+            [("Fight Club",), ("The Matrix",)],
+        )
+
+
+@pytest.fixture(scope="function")
+async def async_client() -> AsyncClient:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="https://localhost:17071/"
+    ) as client:
+        yield client
+
+
+async def aggregates(movie_id: int) -> tuple[float, int]:
+    movie = await Movie.read(movie_id)
+    return movie.ace_user_rating, movie.ace_user_rating_count
+
+
+def test_statements_reset_variables():
+    # Session variables outlive the batch on a pooled connection
+    assert rate_statements(1, 2, 8)[0] == (
+        "SET @movie_id = %s, @user_id = %s, @score = %s",
+        (1, 2, 8),
+    )
+    assert unrate_statements(1, 2)[2][0].startswith("SET @old = (SELECT")
+    assert unrate_statements(1, 2)[-2][0].startswith("DELETE FROM rating")
+
+
+class FakeConnection:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def cursor(self):
+        return None
+
+
+@pytest.mark.parametrize(
+    "constraint, status_code",
+    [("rating_movie_fk", 404), ("rating_user_fk", None)],
+)
+@pytest.mark.anyio
+async def test_rate_foreign_key_errors(monkeypatch, constraint, status_code):
+    async def execute_batch(cursor, statements, transaction=False):
+        raise IntegrityError(
+            1452,
+            "Cannot add or update a child row: a foreign key constraint "
+            f"fails (`rating`, CONSTRAINT `{constraint}`)",
+        )
+
+    monkeypatch.setattr(methods, "Connection", FakeConnection)
+    monkeypatch.setattr(methods, "execute_batch", execute_batch)
+    if status_code:
+        with pytest.raises(HTTPException) as err:
+            await Movie.rate(100, 1, 8)
+        assert err.value.status_code == status_code
+    else:
+        with pytest.raises(IntegrityError):
+            await Movie.rate(1, 100, 8)
+
+
+@pytest.mark.anyio
+async def test_rate_movie(prepare_db):
+    await Movie.rate(1, 1, 8)
+    assert await aggregates(1) == (8, 1)
+    await Movie.rate(1, 3, 5)
+    assert await aggregates(1) == (6.5, 2)
+    await Movie.rate(1, 3, 9)
+    assert await aggregates(1) == (8.5, 2)
+    assert await aggregates(2) == (0, 0)
+
+
+@pytest.mark.anyio
+async def test_rate_movie_not_found(prepare_db):
+    with pytest.raises(HTTPException) as err:
+        await Movie.rate(100, 1, 8)
+    assert err.value.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_unrate_movie(prepare_db):
+    await Movie.rate(1, 1, 8)
+    await Movie.rate(1, 3, 5)
+    await Movie.unrate(1, 3)
+    assert await aggregates(1) == (8, 1)
+    await Movie.unrate(1, 1)
+    assert await aggregates(1) == (0, 0)
+    with pytest.raises(HTTPException) as err:
+        await Movie.unrate(1, 1)
+    assert err.value.status_code == 404
+    assert err.value.detail == "Rating not found"
+
+
+@pytest.mark.anyio
+async def test_delete_user_removes_ratings(prepare_db):
+    await Movie.rate(1, 1, 8)
+    await Movie.rate(1, 3, 4)
+    await Movie.rate(2, 3, 10)
+    await User.delete(3)
+    assert await aggregates(1) == (8, 1)
+    assert await aggregates(2) == (0, 0)
+
+
+@pytest.mark.anyio
+async def test_reconcile_ratings(prepare_db):
+    await Movie.rate(1, 1, 8)
+    await Movie.rate(2, 3, 6)
+    async with Connection() as con:
+        cur = await con.cursor()
+        await cur.execute(
+            "UPDATE movie SET ace_user_rating_sum = 100, "
+            "ace_user_rating_count = 3, ace_user_rating = 33 WHERE id = 1"
+        )
+    reconciler = RatingReconciler(batch_size=1, interval=0)
+    assert await reconciler.reconcile() == 1
+    assert await aggregates(1) == (8, 1)
+    assert await aggregates(2) == (6, 1)
+    assert await reconciler.reconcile() == 0
+
+
+@pytest.mark.anyio
+async def test_rate_invalid_score(async_client: AsyncClient):
+    response = await async_client.put("/movies/1/rating", json={"score": 11})
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_rating_endpoints(prepare_db, async_client: AsyncClient):
+    response = await async_client.put("/movies/1/rating", json={"score": 7})
+    assert response.status_code == 401
+    token = await User.login(
+        UserLoginRequest(
+            username_or_email="user@email.com", password="User123!"
+        )
+    )
+    async_client.cookies.set("token", token)
+    response = await async_client.put("/movies/1/rating", json={"score": 7})
+    assert response.status_code == 200
+    response = await async_client.get("/movies/1")
+    assert response.status_code == 200
+    assert response.json()["ace_user_rating"] == 7
+    assert response.json()["ace_user_rating_count"] == 1
+    response = await async_client.delete("/movies/1/rating")
+    assert response.status_code == 200
+    response = await async_client.get("/movies/1")
+    assert response.json()["ace_user_rating_count"] == 0
+    response = await async_client.get("/movies/100")
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_reconcile_skipped_while_locked(prepare_db):
+    reconciler = RatingReconciler(batch_size=1, interval=0)
+    async with Connection() as con:
+        cur = await con.cursor()
+        await cur.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+        try:
+            assert await reconciler.reconcile() is None
+        finally:
+            await cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+    assert reconciler.skipped == 1
+    assert await reconciler.reconcile() == 0
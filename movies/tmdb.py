@@ -0,0 +1,138 @@
+import asyncio
+import logging
+
+import httpx
+
+from general.config import get_config
+from general.ratelimit import RateLimiter
+
+from .cache import DiskCache
+
+logger = logging.getLogger(__name__)
+config = get_config()
+
+
+class TMDBError(Exception):
+    """Raised when TMDB keeps failing a request."""
+
+
+class TMDBClient:
+    """
+    An async TMDB API client.
+    Connections are pooled and reused, at most `concurrency` requests are
+    in flight, requests are paced to `rate` per second, and successful
+    responses are cached on disk.
+    """
+
+    client: httpx.AsyncClient
+    cache: DiskCache
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        concurrency: int,
+        rate: float,
+        cache: DiskCache,
+        retries: int = 3,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.api_key = api_key
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+            ),
+            timeout=10.0,
+            transport=transport,
+        )
+        self.concurrency = asyncio.Semaphore(concurrency)
+        self.limiter = RateLimiter(rate, max(1, int(rate)), max_keys=1)
+        self.cache = cache
+        self.retries = retries
+        self.requests = 0
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def get(self, path: str, **params) -> dict:
+        """
+        Get a TMDB resource, from the cache when possible
+        Args:
+            path (str): The path, such as /movie/550
+            **params: The query parameters, without the API key
+        Returns:
+            dict: The JSON response
+        """
+        key = path + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+        async with self.concurrency:
+            data = await self.fetch(path, params)
+        await self.cache.set(key, data)
+        return data
+
+    async def fetch(self, path: str, params: dict) -> dict:
+        for attempt in range(self.retries + 1):
+            while wait := self.limiter.hit("tmdb"):
+                await asyncio.sleep(wait)
+            self.requests += 1
+            try:
+                response = await self.client.get(
+                    path, params={**params, "api_key": self.api_key}
+                )
+            except httpx.TransportError as e:
+                logger.warning(f"TMDB request {path} failed: {e}")
+                await asyncio.sleep(2**attempt)
+                continue
+            if response.status_code == 429 or response.status_code >= 500:
+                retry_after = response.headers.get("Retry-After", "")
+                await asyncio.sleep(
+                    float(retry_after) if retry_after.isdigit() else 2**attempt
+                )
+                continue
+            response.raise_for_status()
+            return response.json()
+        raise TMDBError(f"TMDB request {path} failed {self.retries + 1} times")
+
+    async def popular(self, page: int) -> list[int]:
+        """
+        List the ids of popular movies
+        Args:
+            page (int): The page, starting at 1
+        Returns:
+            list[int]: The TMDB ids
+        """
+        data = await self.get("/movie/popular", page=page)
+        return [movie["id"] for movie in data["results"]]
+
+    async def movie(self, tmdb_id: int) -> dict:
+        """
+        Get the details and credits of a movie in one request
+        Args:
+            tmdb_id (int): The TMDB id
+        Returns:
+            dict: The movie
+        """
+        return await self.get(
+            f"/movie/{tmdb_id}", append_to_response="credits"
+        )
+
+
+def create_client(transport: httpx.AsyncBaseTransport | None = None):
+    return TMDBClient(
+        config.TMDB_API_KEY,
+        config.TMDB_BASE_URL,
+        config.TMDB_CONCURRENCY,
+        config.TMDB_RATE_LIMIT,
+        DiskCache(config.TMDB_CACHE_DIR, config.TMDB_CACHE_TTL),
+        transport=transport,
+    )
@@ -1,20 +1,46 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Cookie, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Cookie, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
-from general.schemas import BasicResponse, ErrorResponse
+from general.config import get_config
+from general.etag import etag_matches
+from general.responses import ModelResponse
+from general.schemas import BasicResponse, ErrorResponse, Page
+from general.streaming import json_array, ndjson
 
 from .methods import User
+from .ratelimit import check_rate_limit
 from .schemas import (
     UserCreateRequest,
     UserLoginRequest,
     UserReadResponse,
     UserUpdateRequest,
+    user_adapter,
+    user_list_adapter,
+    user_page_adapter,
 )
 
+config = get_config()
 router = APIRouter(prefix="/users", tags=["User"])
 
+REFRESH_COOKIE_PATH = "/users"
+
+
+def set_refresh_cookie(response: Response, token: str):
+    response.set_cookie(
+        "refresh_token",
+        token,
+        path=REFRESH_COOKIE_PATH,
+        secure=True,
+        httponly=True,
+        samesite="none",
+    )
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": config.USER_CACHE_CONTROL}
+
 
 @router.post(
     "/login",
@@ -23,22 +49,85 @@ router = APIRouter(prefix="/users", tags=["User"])
         200: {"model": BasicResponse},
         401: {"model": ErrorResponse},
         422: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
     },
 )
-async def user_login(user: UserLoginRequest) -> BasicResponse:
+async def user_login(
+    request: Request, user: UserLoginRequest
+) -> BasicResponse:
     """
     Login a user
     Args:
+        request (Request): The request
         user (UserLoginRequest): The user to login
     Returns:
         BasicResponse: The response
     """
+    check_rate_limit(request, user.username_or_email)
     token = await User.login(user)
     response = JSONResponse({"message": "Login successful"})
+    if config.TOKEN_MODE == "signed":
+        set_refresh_cookie(response, token)
+        token = await User.access_token(token)
     response.set_cookie("token", token, secure=True, samesite="none")
     return response
 
 
+@router.post(
+    "/refresh",
+    description="Issue a new access token for the session",
+    responses={
+        200: {"model": BasicResponse},
+        401: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+    },
+)
+async def user_refresh(
+    refresh_token: Annotated[str | None, Cookie()] = None,
+) -> BasicResponse:
+    """
+    Issue a new signed access token
+    Args:
+        refresh_token (str | None): The session token set at login
+    Returns:
+        BasicResponse: The response
+    """
+    if config.TOKEN_MODE != "signed":
+        raise HTTPException(404, "Not Found")
+    token = await User.access_token(refresh_token)
+    response = JSONResponse({"message": "Token refreshed"})
+    response.set_cookie("token", token, secure=True, samesite="none")
+    return response
+
+
+@router.post(
+    "/logout",
+    description="Logout a user",
+    responses={
+        200: {"model": BasicResponse},
+    },
+)
+async def user_logout(
+    token: Annotated[str | None, Cookie()] = None,
+    refresh_token: Annotated[str | None, Cookie()] = None,
+) -> BasicResponse:
+    """
+    Logout a user, ending the session and revoking its access token
+    Args:
+        token (str | None): The session or access token
+        refresh_token (str | None): The session token of an access token
+    Returns:
+        BasicResponse: The response
+    """
+    await User.logout(token, refresh_token)
+    response = JSONResponse({"message": "Logout successful"})
+    response.delete_cookie("token", secure=True, samesite="none")
+    response.delete_cookie(
+        "refresh_token", path=REFRESH_COOKIE_PATH, secure=True, samesite="none"
+    )
+    return response
+
+
 @router.post(
     "/register",
     description="Create a user",
@@ -46,16 +135,21 @@ async def user_login(user: UserLoginRequest) -> BasicResponse:
         200: {"model": BasicResponse},
         409: {"model": ErrorResponse},
         422: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
     },
 )
-async def user_create(user: UserCreateRequest) -> BasicResponse:
+async def user_create(
+    request: Request, user: UserCreateRequest
+) -> BasicResponse:
     """
     Create a user
     Args:
+        request (Request): The request
         user (UserCreateRequest): The user to create
     Returns:
         BasicResponse: The response
     """
+    check_rate_limit(request, user.email)
     await User.create(user)
     return {"message": "User created"}
 
@@ -88,19 +182,90 @@ async def user_confirm(token: str) -> BasicResponse:
     "/",
     description="Search for users",
     responses={
-        200: {"model": list[UserReadResponse]},
+        200: {"model": Page[UserReadResponse]},
         422: {"model": ErrorResponse},
     },
 )
-async def user_search(query: str = "") -> list[UserReadResponse]:
+async def user_search(
+    query: str = "",
+    limit: int = Query(
+        config.PAGE_SIZE_DEFAULT, ge=1, le=config.PAGE_SIZE_MAX
+    ),
+    cursor: str | None = None,
+) -> Page[UserReadResponse]:
     """
     Search for users
     Args:
         query (str): The query to search for
+        limit (int): The maximum number of users to return
+        cursor (str | None): The next_cursor of the previous page
     Returns:
-        list[UserReadResponse]: The users
+        Page[UserReadResponse]: The users and the cursor of the next page
     """
-    return await User.search(query)
+    return ModelResponse(
+        user_page_adapter, await User.search(query, limit, cursor)
+    )
+
+
+@router.get(
+    "/export",
+    description="Export users as newline-delimited JSON or a JSON array",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {
+                "application/x-ndjson": {},
+                "application/json": {},
+            },
+        },
+        401: {"model": ErrorResponse},
+        403: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+    },
+)
+async def user_export(
+    query: str = "",
+    output_format: Literal["ndjson", "json"] = Query("ndjson", alias="format"),
+    token: Annotated[str | None, Cookie()] = None,
+) -> StreamingResponse:
+    """
+    Export users, streaming them without holding the result in memory
+    Args:
+        query (str): The query to search for
+        output_format (str): Either ndjson or json
+    Returns:
+        StreamingResponse: The users
+    """
+    auth = await User.authorize(token)
+    if auth.role != "admin":
+        raise HTTPException(403, "Unauthorized")
+    users = User.stream(query)
+    if output_format == "json":
+        return StreamingResponse(
+            json_array(users), media_type="application/json"
+        )
+    return StreamingResponse(ndjson(users), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/batch",
+    description="Read several users at once",
+    responses={
+        200: {"model": list[UserReadResponse]},
+        422: {"model": ErrorResponse},
+    },
+)
+async def user_read_many(
+    ids: list[int] = Query(min_length=1, max_length=config.PAGE_SIZE_MAX),
+) -> list[UserReadResponse]:
+    """
+    Retrieve the information of several users
+    Args:
+        ids (list[int]): The ids of the users, repeated as ?ids=1&ids=2
+    Returns:
+        list[UserReadResponse]: The users that exist, in the order given
+    """
+    return ModelResponse(user_list_adapter, await User.read_many(ids))
 
 
 @router.get(
@@ -108,18 +273,28 @@ async def user_search(query: str = "") -> list[UserReadResponse]:
     description="Read a user",
     responses={
         200: {"model": UserReadResponse},
+        304: {"description": "The client's copy is current"},
         404: {"model": ErrorResponse},
     },
 )
-async def user_read(user_id: int) -> UserReadResponse:
+async def user_read(
+    user_id: int,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> UserReadResponse:
     """
     Retrieve user information
     Args:
         user_id (int): The id of the user
+        if_none_match (str | None): The ETags of the client's copies
     Returns:
-        UserReadResponse: The user
+        UserReadResponse: The user, or 304 if the client's copy is current
     """
-    return await User.read(user_id)
+    if if_none_match:
+        etag = await User.version(user_id)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=cache_headers(etag))
+    user, etag = await User.read_versioned(user_id)
+    return ModelResponse(user_adapter, user, headers=cache_headers(etag))
 
 
 @router.patch(
@@ -1,7 +1,18 @@
 from fastapi import HTTPException
 
-from database.mariadb.connection import Connection
-from aiomysql import IntegrityError
+from typing import AsyncIterator
+
+from database.mariadb.batch import execute_batch
+from database.mariadb.connection import Connection, used_primary
+from aiomysql import IntegrityError, SSCursor
+from general.cache import TTLCache
+from general.config import get_config
+from general.etag import make_etag
+from general.loader import BatchLoader
+from general.metrics import registry
+from general.pagination import decode_cursor, encode_cursor, page_size
+from general.schemas import Page
+from general.singleflight import SingleFlight
 
 from .schemas import (
     UserLoginRequest,
@@ -9,12 +20,77 @@ from .schemas import (
     UserReadResponse,
     UserUpdateRequest,
     UserAuth,
+    user_list_adapter,
 )
-from .security import generate_token, hash_value
+from .search import index_statements, search_statement
+from .security import DUMMY_HASH, generate_token, password_hasher
+from .sessions import session_store
+from .tokens import is_signed, revocation_list, token_signer
 import logging
-from datetime import timedelta
 
 logger = logging.getLogger(__name__)
+config = get_config()
+
+auth_cache: TTLCache[str, UserAuth] = TTLCache(
+    config.AUTH_CACHE_SIZE, config.AUTH_CACHE_TTL
+)
+
+user_versions: TTLCache[int, str] = TTLCache(
+    config.USER_VERSION_CACHE_SIZE, config.USER_VERSION_CACHE_TTL
+)
+
+auth_cache_lookups = registry.counter(
+    "auth_cache_lookups_total", "Authorization cache lookups", ("result",)
+)
+auth_cache_entries = registry.gauge(
+    "auth_cache_entries", "Cached authorizations"
+)
+
+
+@registry.collector
+def collect_auth_cache_stats():
+    auth_cache_lookups.labels("hit").set(auth_cache.hits)
+    auth_cache_lookups.labels("miss").set(auth_cache.misses)
+    auth_cache_entries.labels().set(len(auth_cache))
+
+
+def users_from_rows(rows: list[tuple]) -> list[UserReadResponse]:
+    """
+    Build users from (id, username, role, profile_picture, ...) rows
+    Args:
+        rows (list[tuple]): The rows
+    Returns:
+        list[UserReadResponse]: The users, validated in a single call
+    """
+    return user_list_adapter.validate_python([
+        {
+            "id": row[0],
+            "username": row[1],
+            "role": row[2],
+            "profile_picture": row[3],
+        }
+        for row in rows
+    ])
+
+
+def invalidate_auth(user_id: int):
+    """
+    Drop every cached authorization of a user
+    Args:
+        user_id (int): The user id
+    """
+    auth_cache.discard_if(lambda _, auth: auth.id == user_id)
+
+
+async def revoke_access(user_id: int):
+    """
+    Make a user's current authorizations re-read their role
+    Args:
+        user_id (int): The user id
+    """
+    invalidate_auth(user_id)
+    if config.TOKEN_MODE == "signed":
+        await revocation_list.revoke(user_id)
 
 
 class User:
@@ -30,29 +106,42 @@ class User:
         async with Connection() as conn:
             cursor = await conn.cursor()
             await cursor.execute(
-                "SELECT id FROM user "
-                "WHERE (username = %s OR email = %s) AND password = %s",
-                (
-                    user.username_or_email,
-                    user.username_or_email,
-                    hash_value(user.password),
-                ),
+                "SELECT id, password FROM user "
+                "WHERE username = %s OR email = %s",
+                (user.username_or_email, user.username_or_email),
             )
             user_data = await cursor.fetchone()
-            if not user_data:
-                raise HTTPException(401, "Invalid username, email or password")
-            token = generate_token()
-            await cursor.execute(
-                "DELETE FROM session WHERE "
-                "user_id = %s AND expiration < NOW()",
-                (user_data[0],),
-            )
-            await cursor.execute(
-                "INSERT INTO session (user_id, token, expiration) "
-                "VALUES (%s, %s, DATE_ADD(NOW(), INTERVAL 1 HOUR))",
-                (user_data[0], token),
-            )
-            return token
+        # Hash outside the connection so it is not held during the KDF, and
+        # for unknown accounts too so the response time does not reveal them
+        valid, outdated = await password_hasher.verify(
+            user.password, user_data[1] if user_data else DUMMY_HASH
+        )
+        if not user_data or not valid:
+            raise HTTPException(401, "Invalid username, email or password")
+        statements = []
+        if outdated:
+            password = await password_hasher.hash(user.password)
+            statements.append((
+                "UPDATE user SET password = %s WHERE id = @user_id",
+                (password,),
+            ))
+        token = generate_token()
+        session_statements = session_store.create_statements(token)
+        if statements or session_statements:
+            async with Connection(multi=True) as conn:
+                cursor = await conn.cursor()
+                await execute_batch(
+                    cursor,
+                    [
+                        ("SET @user_id = %s", (user_data[0],)),
+                        *statements,
+                        *session_statements,
+                    ],
+                    transaction=True,
+                )
+        if not session_statements:
+            token = await session_store.create(user_data[0])
+        return token
 
     @staticmethod
     async def authorize(token: str) -> UserAuth:
@@ -61,30 +150,94 @@ class User:
         Args:
             token (str): The token
         Returns:
-            int: The user id
+            UserAuth: The user id and role
         """
-        async with Connection() as conn:
+        if token and is_signed(token):
+            # Revocations are only tracked in signed mode
+            if config.TOKEN_MODE != "signed":
+                raise HTTPException(401, "Invalid or expired token")
+            claims = token_signer.verify(token)
+            if not claims or revocation_list.is_revoked(claims):
+                raise HTTPException(401, "Invalid or expired token")
+            return UserAuth(id=claims.user_id, role=claims.role)
+        auth = auth_cache.get(token)
+        if auth:
+            return auth
+        auth, ttl = await User.authorize_session(token)
+        auth_cache.set(token, auth, ttl)
+        return auth
+
+    @staticmethod
+    async def authorize_session(token: str) -> tuple[UserAuth, int]:
+        """
+        Authorize a user by session token, extending the session
+        Args:
+            token (str): The session token
+        Returns:
+            tuple[UserAuth, int]: The user id and role, and the seconds
+                until the session expires
+        """
+        session = await session_store.find(token)
+        if not session:
+            raise HTTPException(401, "Invalid or expired token")
+        role = session.role or await User.role(session.user_id)
+        if not role:
+            raise HTTPException(401, "Invalid or expired token")
+        if session.ttl < 15 * 60:
+            await session_store.refresh(token, session.user_id)
+        return UserAuth(id=session.user_id, role=role), session.ttl
+
+    @staticmethod
+    async def access_token(refresh_token: str) -> str:
+        """
+        Issue a signed access token for a session
+        Args:
+            refresh_token (str): The session token
+        Returns:
+            str: The access token
+        """
+        if not refresh_token or is_signed(refresh_token):
+            raise HTTPException(401, "Invalid or expired token")
+        auth, _ = await User.authorize_session(refresh_token)
+        return token_signer.sign(auth.id, auth.role)
+
+    @staticmethod
+    async def logout(token: str | None, refresh_token: str | None = None):
+        """
+        End the session behind a pair of tokens
+        Args:
+            token (str | None): The session or access token
+            refresh_token (str | None): The session token of an access token
+        """
+        for session_token in (token, refresh_token):
+            if not session_token or is_signed(session_token):
+                continue
+            auth_cache.pop(session_token)
+            await session_store.revoke(session_token)
+        if token and is_signed(token):
+            # Revocations are only tracked in signed mode
+            if config.TOKEN_MODE != "signed":
+                raise HTTPException(401, "Invalid or expired token")
+            claims = token_signer.verify(token)
+            if claims:
+                await revocation_list.revoke(claims.user_id)
+
+    @staticmethod
+    async def role(user_id: int) -> str | None:
+        """
+        Get the role of a user
+        Args:
+            user_id (int): The user id
+        Returns:
+            str | None: The role, or None if the user does not exist
+        """
+        async with Connection(read_only=True) as conn:
             cursor = await conn.cursor()
             await cursor.execute(
-                "SELECT user_id, expiration, NOW() FROM session "
-                "WHERE token = %s AND expiration > NOW()",
-                (token,),
+                "SELECT role FROM user WHERE id = %s", (user_id,)
             )
             user_data = await cursor.fetchone()
-            if not user_data:
-                raise HTTPException(401, "Invalid or expired token")
-            if user_data[1] < user_data[2] + timedelta(minutes=15):
-                await cursor.execute(
-                    "UPDATE session SET "
-                    "expiration = DATE_ADD(NOW(), INTERVAL 1 HOUR) "
-                    "WHERE token = %s",
-                    (token,),
-                )
-            await cursor.execute(
-                "SELECT role FROM user WHERE id = %s", (user_data[0],)
-            )
-            role = (await cursor.fetchone())[0]
-            return UserAuth(id=user_data[0], role=role)
+        return user_data[0] if user_data else None
 
     @staticmethod
     async def create(user: UserCreateRequest):
@@ -93,29 +246,39 @@ class User:
         Args:
             user (UserCreateRequest): The user to create
         """
-        async with Connection() as conn:
+        password = await password_hasher.hash(user.password)
+        token = generate_token()
+        session_statements = session_store.create_statements(token)
+        async with Connection(multi=True) as conn:
             cursor = await conn.cursor()
             try:
-                await cursor.execute(
-                    "INSERT INTO user "
-                    "(username, password, email, role, created_at, updated_at) "
-                    "VALUES (%s, %s, %s, 'new_user', NOW(), NOW())",
-                    (user.username, hash_value(user.password), user.email),
+                results = await execute_batch(
+                    cursor,
+                    [
+                        (
+                            "INSERT INTO user "
+                            "(username, password, email, role, "
+                            "created_at, updated_at) "
+                            "VALUES (%s, %s, %s, 'new_user', NOW(), NOW(6))",
+                            (user.username, password, user.email),
+                        ),
+                        ("SET @user_id = LAST_INSERT_ID()", ()),
+                        *index_statements(user.username),
+                        *session_statements,
+                    ],
+                    transaction=True,
                 )
             except IntegrityError as e:
                 if "username" in e.args[1]:
                     raise HTTPException(409, "Username already exists")
                 if "email" in e.args[1]:
                     raise HTTPException(409, "Email already exists")
-            token = generate_token()
-            await cursor.execute(
-                "INSERT INTO session (user_id, token, expiration) "
-                "VALUES (%s, %s, DATE_ADD(NOW(), INTERVAL 1 HOUR))",
-                (cursor.lastrowid, token),
-            )
-            logger.info(
-                f"User created: {user.username} with assigned token {token}"
-            )
+                raise
+        if not session_statements:
+            token = await session_store.create(results[0].lastrowid)
+        logger.info(
+            f"User created: {user.username} with assigned token {token}"
+        )
 
     @staticmethod
     async def confirm(token: str):
@@ -124,42 +287,84 @@ class User:
         Args:
             token (str): The token
         """
+        session = await session_store.find(token)
+        if not session:
+            raise HTTPException(404, "Token not found")
         async with Connection() as conn:
             cursor = await conn.cursor()
             await cursor.execute(
-                "UPDATE user SET role = 'user' "
-                "WHERE id = (SELECT user_id FROM session WHERE token = %s)",
-                (token,),
+                "UPDATE user SET role = 'user', updated_at = NOW(6) "
+                "WHERE id = %s",
+                (session.user_id,),
             )
-            if cursor.rowcount == 0:
-                raise HTTPException(404, "Token not found")
+        user_versions.pop(session.user_id)
+        await revoke_access(session.user_id)
 
     @staticmethod
-    async def search(query: str) -> list[UserReadResponse]:
+    async def search(
+        query: str, limit: int | None = None, cursor: str | None = None
+    ) -> Page[UserReadResponse]:
         """
         Search for users
         Args:
             query (str): The search query
+            limit (int | None): The page size, capped by PAGE_SIZE_MAX
+            cursor (str | None): The cursor returned with the previous page
         Returns:
-            list[UserReadResponse]: The users
+            Page[UserReadResponse]: The users, most relevant first
         """
-        async with Connection() as conn:
-            cursor = await conn.cursor()
-            await cursor.execute(
-                "SELECT id, username, role, profile_picture "
-                "FROM user WHERE username LIKE %s ORDER BY id",
-                (f"%{query}%",),
+        limit = page_size(limit)
+        after = decode_cursor(cursor, 2) if cursor else None
+        if used_primary.get():
+            # A shared query could be routed to a lagging replica
+            return await User.run_search(query, limit, after)
+        return await search_flight.do(
+            (query, limit, after),
+            lambda: User.run_search(query, limit, after),
+        )
+
+    @staticmethod
+    async def run_search(
+        query: str, limit: int, after: tuple | None
+    ) -> Page[UserReadResponse]:
+        """
+        Run a search query
+        Args:
+            query (str): The search query
+            limit (int): The page size
+            after (tuple | None): The decoded cursor of the previous page
+        Returns:
+            Page[UserReadResponse]: The users, most relevant first
+        """
+        async with Connection(read_only=True) as conn:
+            db_cursor = await conn.cursor()
+            await db_cursor.execute(
+                *search_statement(query, limit + 1, after)
             )
-            user_data = await cursor.fetchall()
-            return [
-                UserReadResponse(
-                    id=user[0],
-                    username=user[1],
-                    role=user[2],
-                    profile_picture=user[3],
-                )
-                for user in user_data
-            ]
+            user_data = await db_cursor.fetchall()
+        next_cursor = None
+        if len(user_data) > limit:
+            user_data = user_data[:limit]
+            next_cursor = encode_cursor((user_data[-1][4], user_data[-1][0]))
+        return Page[UserReadResponse](
+            items=users_from_rows(user_data), next_cursor=next_cursor
+        )
+
+    @staticmethod
+    async def stream(query: str) -> AsyncIterator[list[UserReadResponse]]:
+        """
+        Stream every user matching a search with an unbuffered cursor
+        Args:
+            query (str): The search query
+        Returns:
+            AsyncIterator[list[UserReadResponse]]: Chunks of users, most
+                relevant first
+        """
+        async with Connection(read_only=True) as conn:
+            cursor = await conn.cursor(SSCursor)
+            await cursor.execute(*search_statement(query))
+            while rows := await cursor.fetchmany(config.STREAM_CHUNK_SIZE):
+                yield users_from_rows(rows)
 
     @staticmethod
     async def read(user_id: int) -> UserReadResponse:
@@ -170,22 +375,90 @@ class User:
         Returns:
             UserReadResponse: The user data
         """
-        async with Connection() as conn:
+        return (await User.read_versioned(user_id))[0]
+
+    @staticmethod
+    async def read_versioned(user_id: int) -> tuple[UserReadResponse, str]:
+        """
+        Read a user along with the entity tag of its current version
+        Args:
+            user_id (int): The user id
+        Returns:
+            tuple[UserReadResponse, str]: The user data and its ETag
+        """
+        if used_primary.get():
+            # A batch could be routed to a lagging replica
+            result = (await User.load([user_id])).get(user_id)
+        else:
+            result = await user_loader.load(user_id)
+        if not result:
+            raise HTTPException(404, "User not found")
+        return result
+
+    @staticmethod
+    async def read_many(user_ids: list[int]) -> list[UserReadResponse]:
+        """
+        Read several users with a single query
+        Args:
+            user_ids (list[int]): The user ids
+        Returns:
+            list[UserReadResponse]: The users that exist, in the order of
+                their first id
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        users = await User.load(user_ids)
+        return [users[i][0] for i in user_ids if i in users]
+
+    @staticmethod
+    async def load(
+        user_ids: list[int],
+    ) -> dict[int, tuple[UserReadResponse, str]]:
+        """
+        Read users by id along with their ETags
+        Args:
+            user_ids (list[int]): The distinct user ids
+        Returns:
+            dict[int, tuple[UserReadResponse, str]]: The users found
+        """
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        async with Connection(read_only=True) as conn:
             cursor = await conn.cursor()
             await cursor.execute(
-                "SELECT username, role, profile_picture "
-                "FROM user WHERE id = %s",
-                (user_id,),
+                "SELECT id, username, role, profile_picture, updated_at "
+                f"FROM user WHERE id IN ({placeholders})",
+                user_ids,
             )
-            user_data = await cursor.fetchone()
-            if not user_data:
-                raise HTTPException(404, "User not found")
-            return UserReadResponse(
-                id=user_id,
-                username=user_data[0],
-                role=user_data[1],
-                profile_picture=user_data[2],
+            user_data = await cursor.fetchall()
+        result = {}
+        for row, user in zip(user_data, users_from_rows(user_data)):
+            etag = make_etag(row[4])
+            user_versions.set(user.id, etag)
+            result[user.id] = (user, etag)
+        return result
+
+    @staticmethod
+    async def version(user_id: int) -> str:
+        """
+        Get the entity tag of a user without reading the profile
+        Args:
+            user_id (int): The user id
+        Returns:
+            str: The ETag, from the version cache when possible
+        """
+        etag = user_versions.get(user_id)
+        if etag:
+            return etag
+        async with Connection(read_only=True) as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "SELECT updated_at FROM user WHERE id = %s", (user_id,)
             )
+            user_data = await cursor.fetchone()
+        if not user_data:
+            raise HTTPException(404, "User not found")
+        etag = make_etag(user_data[0])
+        user_versions.set(user_id, etag)
+        return etag
 
     @staticmethod
     async def update(user_id: int, user: UserUpdateRequest):
@@ -195,34 +468,50 @@ class User:
             user_id (int): The user id
             user (UserUpdateRequest): The user data to update
         """
-        async with Connection() as conn:
+        password = None
+        if user.password:
+            password = await password_hasher.hash(user.password)
+        statements = [
+            ("SET @user_id = %s", (user_id,)),
+            (
+                "UPDATE user SET "
+                "username = COALESCE(%s, username), "
+                "password = COALESCE(%s, password), "
+                "email = COALESCE(%s, email), "
+                "role = COALESCE(%s, role), "
+                "profile_picture = COALESCE(%s, profile_picture), "
+                "updated_at = NOW(6) "
+                "WHERE id = @user_id",
+                (
+                    user.username,
+                    password,
+                    user.email,
+                    user.role,
+                    user.profile_picture,
+                ),
+            ),
+        ]
+        if user.username:
+            # Reindexed in the same transaction, so search never sees the
+            # new username with the old trigrams
+            statements += index_statements(user.username)
+        async with Connection(multi=True) as conn:
             cursor = await conn.cursor()
             try:
-                await cursor.execute(
-                    "UPDATE user SET "
-                    "username = COALESCE(%s, username), "
-                    "password = COALESCE(%s, password), "
-                    "email = COALESCE(%s, email), "
-                    "role = COALESCE(%s, role), "
-                    "profile_picture = COALESCE(%s, profile_picture), "
-                    "updated_at = NOW() "
-                    "WHERE id = %s",
-                    (
-                        user.username,
-                        hash_value(user.password) if user.password else None,
-                        user.email,
-                        user.role,
-                        user.profile_picture,
-                        user_id,
-                    ),
+                results = await execute_batch(
+                    cursor, statements, transaction=True
                 )
             except IntegrityError as e:
                 if "username" in e.args[1]:
                     raise HTTPException(409, "Username already exists")
                 if "email" in e.args[1]:
                     raise HTTPException(409, "Email already exists")
-            if cursor.rowcount == 0:
-                raise HTTPException(404, "User not found")
+                raise
+        if results[1].rowcount == 0:
+            raise HTTPException(404, "User not found")
+        user_versions.pop(user_id)
+        if user.role:
+            await revoke_access(user_id)
 
     @staticmethod
     async def delete(user_id: int):
@@ -231,11 +520,56 @@ class User:
         Args:
             user_id (int): The user id
         """
-        async with Connection() as conn:
+        session_statements = session_store.revoke_user_statements()
+        async with Connection(multi=True) as conn:
             cursor = await conn.cursor()
-            await cursor.execute(
-                "DELETE FROM session WHERE user_id = %s", (user_id,)
+            results = await execute_batch(
+                cursor,
+                [
+                    ("SET @user_id = %s", (user_id,)),
+                    *session_statements,
+                    ("DELETE FROM user WHERE id = @user_id", ()),
+                ],
+                transaction=True,
             )
-            await cursor.execute("DELETE FROM user WHERE id = %s", (user_id,))
-            if cursor.rowcount == 0:
-                raise HTTPException(404, "User not found")
+        if not session_statements:
+            await session_store.revoke_user(user_id)
+        user_versions.pop(user_id)
+        await revoke_access(user_id)
+        if results[-1].rowcount == 0:
+            raise HTTPException(404, "User not found")
+
+
+user_loader: BatchLoader[int, tuple[UserReadResponse, str]] = BatchLoader(
+    User.load, config.PAGE_SIZE_MAX
+)
+
+search_flight: SingleFlight[tuple, Page[UserReadResponse]] = SingleFlight(
+    TTLCache(config.SEARCH_CACHE_SIZE, config.SEARCH_CACHE_TTL)
+)
+
+user_loader_loads = registry.counter(
+    "user_loader_loads_total", "User reads requested through the loader"
+)
+user_loader_batches = registry.counter(
+    "user_loader_batches_total", "Queries issued by the user loader"
+)
+
+
+@registry.collector
+def collect_loader_stats():
+    user_loader_loads.labels().set(user_loader.loads)
+    user_loader_batches.labels().set(user_loader.batches)
+
+
+search_calls = registry.counter(
+    "user_search_calls_total", "User searches by how they were served",
+    ("result",),
+)
+
+
+@registry.collector
+def collect_search_stats():
+    search_calls.labels("executed").set(search_flight.executed)
+    search_calls.labels("coalesced").set(search_flight.coalesced)
+    search_calls.labels("cached").set(search_flight.cached)
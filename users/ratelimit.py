@@ -0,0 +1,71 @@
+from math import ceil
+
+from fastapi import HTTPException, Request
+
+from general.config import get_config
+from general.metrics import registry
+from general.ratelimit import RateLimiter
+from general.tasks import PeriodicTask
+
+config = get_config()
+
+ip_limiter = RateLimiter(
+    config.RATE_LIMIT_IP_RATE,
+    config.RATE_LIMIT_IP_BURST,
+    config.RATE_LIMIT_MAX_KEYS,
+    config.RATE_LIMIT_SHARDS,
+)
+account_limiter = RateLimiter(
+    config.RATE_LIMIT_ACCOUNT_RATE,
+    config.RATE_LIMIT_ACCOUNT_BURST,
+    config.RATE_LIMIT_MAX_KEYS,
+    config.RATE_LIMIT_SHARDS,
+)
+limiters = {"ip": ip_limiter, "account": account_limiter}
+
+
+async def evict():
+    for limiter in limiters.values():
+        await limiter.evict()
+
+
+rate_limit_eviction = PeriodicTask(
+    "rate limit eviction", config.RATE_LIMIT_EVICT_INTERVAL, evict
+)
+
+rate_limit_requests = registry.counter(
+    "rate_limit_requests_total", "Requests seen by a rate limiter",
+    ("limiter", "result"),
+)
+rate_limit_keys = registry.gauge(
+    "rate_limit_keys", "Keys tracked by a rate limiter", ("limiter",)
+)
+
+
+@registry.collector
+def collect_rate_limit_stats():
+    for name, limiter in limiters.items():
+        rate_limit_requests.labels(name, "allowed").set(limiter.allowed)
+        rate_limit_requests.labels(name, "rejected").set(limiter.rejected)
+        rate_limit_keys.labels(name).set(len(limiter))
+
+
+def check_rate_limit(request: Request, account: str):
+    """
+    Reject a request whose client or account is over its rate limit
+    Args:
+        request (Request): The request
+        account (str): The username or email the request is for
+    """
+    if not config.RATE_LIMIT_ENABLED:
+        return
+    host = request.client.host if request.client else ""
+    wait = ip_limiter.hit(host)
+    if not wait:
+        wait = account_limiter.hit(account.lower())
+    if wait:
+        raise HTTPException(
+            429,
+            "Too Many Requests",
+            headers={"Retry-After": str(ceil(wait))},
+        )
@@ -0,0 +1,78 @@
+import logging
+from time import perf_counter
+
+from database.mariadb.connection import Connection
+from general.config import get_config
+from general.metrics import registry
+from general.tasks import PeriodicTask
+
+logger = logging.getLogger(__name__)
+config = get_config()
+
+
+class SessionReaper:
+    """Periodically purge expired sessions in bounded batches."""
+
+    batch_size: int
+    task: PeriodicTask
+
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.task = PeriodicTask("session reaper", interval, self.reap)
+        self.runs = 0
+        self.removed_total = 0
+        self.last_removed = 0
+        self.last_duration = 0.0
+
+    def start(self):
+        self.task.start()
+
+    async def stop(self):
+        await self.task.stop()
+
+    async def reap(self) -> int:
+        """
+        Delete expired sessions, one batch per statement
+        Returns:
+            int: The number of deleted sessions
+        """
+        start = perf_counter()
+        removed = 0
+        async with Connection() as conn:
+            cursor = await conn.cursor()
+            while True:
+                await cursor.execute(
+                    "DELETE FROM session WHERE expiration < NOW() LIMIT %s",
+                    (self.batch_size,),
+                )
+                removed += cursor.rowcount
+                if cursor.rowcount < self.batch_size:
+                    break
+        self.runs += 1
+        self.removed_total += removed
+        self.last_removed = removed
+        self.last_duration = perf_counter() - start
+        if removed:
+            logger.info(
+                f"Removed {removed} expired sessions "
+                f"in {self.last_duration:.3f}s"
+            )
+        return removed
+
+
+session_reaper = SessionReaper(
+    config.SESSION_REAP_BATCH_SIZE, config.SESSION_REAP_INTERVAL
+)
+
+sessions_reaped = registry.counter(
+    "sessions_reaped_total", "Expired sessions removed by the reaper"
+)
+session_reap_duration = registry.gauge(
+    "session_reap_duration_seconds", "Duration of the last reaper run"
+)
+
+
+@registry.collector
+def collect_reaper_stats():
+    sessions_reaped.labels().set(session_reaper.removed_total)
+    session_reap_duration.labels().set(session_reaper.last_duration)
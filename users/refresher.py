@@ -0,0 +1,113 @@
+import logging
+
+from database.mariadb.connection import Connection
+from general.config import get_config
+from general.metrics import registry
+from general.tasks import PeriodicTask
+
+logger = logging.getLogger(__name__)
+config = get_config()
+
+
+class SessionRefresher:
+    """
+    Write-behind buffer for sliding session expiration refreshes.
+    Tokens are de-duplicated in memory and extended by a single UPDATE per
+    flush interval instead of one UPDATE per authorized request.
+    """
+
+    max_size: int
+    pending: dict[str, None]
+    task: PeriodicTask
+
+    def __init__(self, max_size: int, interval: float):
+        self.max_size = max_size
+        self.pending = {}
+        self.task = PeriodicTask("session refresher", interval, self.flush)
+        self.queued = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.flushed = 0
+
+    def start(self):
+        self.task.start()
+
+    async def stop(self):
+        """Stop the background task and flush what is still pending."""
+        await self.task.stop()
+        await self.flush()
+
+    async def refresh(self, token: str):
+        """
+        Extend a session, deferring the write while the task is running
+        Args:
+            token (str): The session token
+        """
+        if not self.task.running:
+            await self.write([token])
+            return
+        if token in self.pending:
+            self.deduplicated += 1
+            return
+        if len(self.pending) >= self.max_size:
+            self.dropped += 1
+            return
+        self.pending[token] = None
+        self.queued += 1
+
+    async def flush(self):
+        """Write every pending refresh in one statement."""
+        if not self.pending:
+            return
+        tokens = list(self.pending)
+        self.pending = {}
+        try:
+            await self.write(tokens)
+        except BaseException:
+            # Requeue so a failed or cancelled write is retried by the
+            # next flush instead of letting the sessions expire
+            for token in tokens:
+                if len(self.pending) >= self.max_size:
+                    break
+                self.pending.setdefault(token)
+            raise
+        self.flushed += len(tokens)
+        logger.debug(f"Refreshed {len(tokens)} sessions")
+
+    @staticmethod
+    async def write(tokens: list[str]):
+        """
+        Extend the expiration of sessions
+        Args:
+            tokens (list[str]): The session tokens
+        """
+        placeholders = ", ".join(["%s"] * len(tokens))
+        async with Connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "UPDATE session SET "
+                "expiration = DATE_ADD(NOW(), INTERVAL %s SECOND) "
+                f"WHERE token IN ({placeholders}) AND expiration > NOW()",
+                [config.SESSION_TTL, *tokens],
+            )
+
+
+session_refresher = SessionRefresher(
+    config.SESSION_REFRESH_QUEUE_SIZE, config.SESSION_REFRESH_INTERVAL
+)
+
+session_refreshes = registry.counter(
+    "session_refreshes_total",
+    "Session expiration refreshes by outcome",
+    ("outcome",),
+)
+
+
+@registry.collector
+def collect_refresher_stats():
+    session_refreshes.labels("queued").set(session_refresher.queued)
+    session_refreshes.labels("deduplicated").set(
+        session_refresher.deduplicated
+    )
+    session_refreshes.labels("dropped").set(session_refresher.dropped)
+    session_refreshes.labels("flushed").set(session_refresher.flushed)
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from .validators import validate_password, validate_username, validate_email
 from fastapi import HTTPException
 
+from general.schemas import Page
+
 
 class UserLoginRequest(BaseModel):
     username_or_email: str = Field(
@@ -109,3 +111,9 @@ class UserUpdateRequest(BaseModel):
 class UserAuth(BaseModel):
     id: int = Field(description="The id of the user", examples=[1])
     role: str = Field(description="The role of the user", examples=["user"])
+
+
+# Built once: creating a TypeAdapter compiles a pydantic-core schema
+user_adapter = TypeAdapter(UserReadResponse)
+user_list_adapter = TypeAdapter(list[UserReadResponse])
+user_page_adapter = TypeAdapter(Page[UserReadResponse])
@@ -0,0 +1,113 @@
+from database.mariadb.batch import Statement
+
+MIN_SUBSTRING_LENGTH = 3
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Split text into its lowercase trigrams
+    Args:
+        text (str): The text
+    Returns:
+        set[str]: The trigrams
+    """
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def escape_like(text: str) -> str:
+    """
+    Escape the wildcards of a LIKE pattern
+    Args:
+        text (str): The text
+    Returns:
+        str: The text matching itself literally in a LIKE pattern
+    """
+    return (
+        text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+
+
+RELEVANCE = (
+    "CASE WHEN user.username = %s THEN 0 "
+    "WHEN user.username LIKE %s THEN 1 ELSE 2 END"
+)
+
+
+def search_statement(
+    query: str, limit: int | None = None, after: tuple | None = None
+) -> tuple[str, list]:
+    """
+    Build the statement searching usernames, most relevant first
+    Exact matches rank before prefix matches, which rank before other
+    substring matches. Queries of at least three characters are narrowed
+    through the `user_trigram` index; shorter ones have no trigram and fall
+    back to scanning the usernames. Rows are ordered by (relevance, id),
+    which is also the keyset used for pagination. An empty query matches
+    every user with a constant relevance and pages directly on the primary
+    key.
+    Args:
+        query (str): The search query
+        limit (int | None): The maximum number of rows
+        after (tuple | None): The (relevance, id) of the last row already seen
+    Returns:
+        tuple[str, list]: The statement and its parameters
+    """
+    prefix = escape_like(query) + "%"
+    relevance_params = [query, prefix] if query else []
+    join = ""
+    conditions = []
+    params = list(relevance_params)
+    if query and len(query) < MIN_SUBSTRING_LENGTH:
+        conditions.append("user.username LIKE %s")
+        params.append("%" + escape_like(query) + "%")
+    elif query:
+        grams = sorted(trigrams(query))
+        placeholders = ", ".join(["%s"] * len(grams))
+        join = (
+            "JOIN (SELECT user_id FROM user_trigram "
+            f"WHERE trigram IN ({placeholders}) "
+            "GROUP BY user_id HAVING COUNT(*) = %s) AS candidate "
+            "ON candidate.user_id = user.id "
+        )
+        params += grams + [len(grams)]
+        conditions.append("user.username LIKE %s")
+        params.append("%" + escape_like(query) + "%")
+    if after and not query:
+        conditions.append("user.id > %s")
+        params.append(after[1])
+    elif after:
+        conditions.append(f"({RELEVANCE}, user.id) > (%s, %s)")
+        params += relevance_params + list(after)
+    sql = (
+        "SELECT user.id, user.username, user.role, user.profile_picture, "
+        f"{RELEVANCE if query else 0} AS relevance FROM user {join}"
+    )
+    if conditions:
+        sql += "WHERE " + " AND ".join(conditions) + " "
+    sql += "ORDER BY relevance, user.id" if query else "ORDER BY user.id"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    return sql, params
+
+
+def index_statements(username: str) -> list[Statement]:
+    """
+    Build the statements replacing the trigrams of the user in @user_id
+    Args:
+        username (str): The username
+    Returns:
+        list[Statement]: The statements and their parameters
+    """
+    statements = [("DELETE FROM user_trigram WHERE user_id = @user_id", ())]
+    grams = sorted(trigrams(username))
+    if grams:
+        values = ", ".join(["(%s, @user_id)"] * len(grams))
+        statements.append((
+            f"INSERT IGNORE INTO user_trigram (trigram, user_id) "
+            f"VALUES {values}",
+            grams,
+        ))
+    return statements
+
@@ -0,0 +1,43 @@
+from database.kv.client import KeyValueClient
+from general.config import get_config
+
+from ..reaper import session_reaper
+from ..refresher import session_refresher
+from .base import SessionInfo, SessionStore
+from .kv import KeyValueSessionStore
+from .memory import MemorySessionStore
+from .sql import SqlSessionStore
+
+config = get_config()
+
+
+def create_session_store(backend: str) -> SessionStore:
+    """
+    Build the session store for a backend
+    Args:
+        backend (str): One of sql, memory or kv
+    Returns:
+        SessionStore: The store
+    """
+    if backend == "memory":
+        return MemorySessionStore(
+            config.SESSION_TTL,
+            config.SESSION_MEMORY_SHARDS,
+            config.SESSION_REAP_INTERVAL,
+        )
+    if backend == "kv":
+        return KeyValueSessionStore(
+            config.SESSION_TTL,
+            KeyValueClient(
+                config.SESSION_KV_HOST,
+                config.SESSION_KV_PORT,
+                config.SESSION_KV_POOL_SIZE,
+                config.SESSION_KV_TIMEOUT,
+            ),
+        )
+    return SqlSessionStore(
+        config.SESSION_TTL, session_refresher, session_reaper
+    )
+
+
+session_store = create_session_store(config.SESSION_BACKEND)
@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+from database.mariadb.batch import Statement
+
+
+class SessionInfo(NamedTuple):
+    user_id: int
+    ttl: int
+    # Filled in by stores that can join the user table, saving a lookup
+    role: str | None = None
+
+
+class SessionStore(ABC):
+    """
+    Where login sessions live.
+    A session expires `ttl` seconds after it was created or last refreshed.
+    """
+
+    ttl: int
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    def start(self):
+        """Start background maintenance, if the store needs any."""
+
+    async def stop(self):
+        """Stop background maintenance and release resources."""
+
+    def create_statements(self, token: str) -> list[Statement]:
+        """
+        Build the statements creating a session for the user in @user_id,
+        for stores kept in the database to join the caller's transaction
+        Args:
+            token (str): The session token
+        Returns:
+            list[Statement]: The statements, empty for other stores
+        """
+        return []
+
+    def revoke_user_statements(self) -> list[Statement]:
+        """
+        Build the statements ending every session of the user in @user_id
+        Returns:
+            list[Statement]: The statements, empty for other stores
+        """
+        return []
+
+    @abstractmethod
+    async def create(self, user_id: int) -> str:
+        """
+        Start a session
+        Args:
+            user_id (int): The user id
+        Returns:
+            str: The session token
+        """
+
+    @abstractmethod
+    async def find(self, token: str) -> SessionInfo | None:
+        """
+        Find an unexpired session
+        Args:
+            token (str): The session token
+        Returns:
+            SessionInfo | None: The session, or None if missing or expired
+        """
+
+    @abstractmethod
+    async def refresh(self, token: str, user_id: int):
+        """
+        Extend a session to the full TTL
+        Args:
+            token (str): The session token
+            user_id (int): The user id of the session
+        """
+
+    @abstractmethod
+    async def revoke(self, token: str):
+        """
+        End a session
+        Args:
+            token (str): The session token
+        """
+
+    @abstractmethod
+    async def revoke_user(self, user_id: int):
+        """
+        End every session of a user
+        Args:
+            user_id (int): The user id
+        """
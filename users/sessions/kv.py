@@ -0,0 +1,65 @@
+from database.kv.client import KeyValueClient
+
+from ..security import generate_token
+from .base import SessionInfo, SessionStore
+
+
+class KeyValueSessionStore(SessionStore):
+    """
+    Sessions in an external RESP key-value server.
+    Each session is a key expiring with the session. A set per user lists
+    its tokens for bulk revocation and lives as long as its newest session.
+    """
+
+    client: KeyValueClient
+
+    def __init__(self, ttl: int, client: KeyValueClient):
+        super().__init__(ttl)
+        self.client = client
+
+    async def stop(self):
+        await self.client.close()
+
+    @staticmethod
+    def session_key(token: str) -> str:
+        return f"session:{token}"
+
+    @staticmethod
+    def user_key(user_id: int) -> str:
+        return f"user_sessions:{user_id}"
+
+    async def create(self, user_id: int) -> str:
+        token = generate_token()
+        await self.client.execute_all(
+            ("SET", self.session_key(token), user_id, "EX", self.ttl),
+            ("SADD", self.user_key(user_id), token),
+            ("EXPIRE", self.user_key(user_id), self.ttl),
+        )
+        return token
+
+    async def find(self, token: str) -> SessionInfo | None:
+        user_id, ttl = await self.client.execute_all(
+            ("GET", self.session_key(token)),
+            ("TTL", self.session_key(token)),
+        )
+        if user_id is None or ttl < 0:
+            return None
+        return SessionInfo(int(user_id), ttl)
+
+    async def refresh(self, token: str, user_id: int):
+        await self.client.execute_all(
+            ("EXPIRE", self.session_key(token), self.ttl),
+            ("EXPIRE", self.user_key(user_id), self.ttl),
+        )
+
+    async def revoke(self, token: str):
+        user_id = await self.client.execute("GET", self.session_key(token))
+        commands = [("DEL", self.session_key(token))]
+        if user_id is not None:
+            commands.append(("SREM", self.user_key(int(user_id)), token))
+        await self.client.execute_all(*commands)
+
+    async def revoke_user(self, user_id: int):
+        tokens = await self.client.execute("SMEMBERS", self.user_key(user_id))
+        keys = [self.session_key(token) for token in tokens]
+        await self.client.execute("DEL", self.user_key(user_id), *keys)
@@ -0,0 +1,91 @@
+import asyncio
+from time import monotonic
+
+from general.tasks import PeriodicTask
+
+from ..security import generate_token
+from .base import SessionInfo, SessionStore
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessions in process memory, for single-node deployments.
+    Sessions are sharded by token so that sweeping expired entries yields
+    to the event loop between shards. Sessions are lost on restart.
+    """
+
+    shards: list[dict[str, tuple[int, float]]]
+    users: dict[int, set[str]]
+
+    def __init__(self, ttl: int, shards: int, sweep_interval: float):
+        super().__init__(ttl)
+        self.shards = [{} for _ in range(shards)]
+        self.users = {}
+        self.task = PeriodicTask("session sweeper", sweep_interval, self.sweep)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def shard(self, token: str) -> dict[str, tuple[int, float]]:
+        return self.shards[hash(token) % len(self.shards)]
+
+    def start(self):
+        self.task.start()
+
+    async def stop(self):
+        await self.task.stop()
+
+    async def create(self, user_id: int) -> str:
+        token = generate_token()
+        self.shard(token)[token] = (user_id, monotonic() + self.ttl)
+        self.users.setdefault(user_id, set()).add(token)
+        return token
+
+    async def find(self, token: str) -> SessionInfo | None:
+        session = self.shard(token).get(token)
+        if session is None:
+            return None
+        user_id, expires_at = session
+        remaining = expires_at - monotonic()
+        if remaining <= 0:
+            self.remove(token)
+            return None
+        return SessionInfo(user_id, int(remaining))
+
+    async def refresh(self, token: str, user_id: int):
+        shard = self.shard(token)
+        if token in shard:
+            shard[token] = (user_id, monotonic() + self.ttl)
+
+    async def revoke(self, token: str):
+        self.remove(token)
+
+    async def revoke_user(self, user_id: int):
+        for token in self.users.pop(user_id, ()):
+            self.shard(token).pop(token, None)
+
+    def remove(self, token: str):
+        session = self.shard(token).pop(token, None)
+        if session is None:
+            return
+        tokens = self.users.get(session[0])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self.users[session[0]]
+
+    async def sweep(self) -> int:
+        """
+        Drop expired sessions, yielding between shards
+        Returns:
+            int: The number of sessions dropped
+        """
+        removed = 0
+        for shard in self.shards:
+            now = monotonic()
+            expired = [t for t, (_, at) in shard.items() if at <= now]
+            for token in expired:
+                self.remove(token)
+            removed += len(expired)
+            await asyncio.sleep(0)
+        return removed
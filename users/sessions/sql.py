@@ -0,0 +1,104 @@
+from database.mariadb.batch import Statement, execute_batch
+from database.mariadb.connection import Connection
+
+from ..reaper import SessionReaper
+from ..refresher import SessionRefresher
+from ..security import generate_token
+from .base import SessionInfo, SessionStore
+
+
+class SqlSessionStore(SessionStore):
+    """
+    Sessions in the MariaDB `session` table.
+    Refreshes are written behind in batches and expired rows are purged by
+    a background reaper.
+    """
+
+    refresher: SessionRefresher
+    reaper: SessionReaper
+
+    def __init__(
+        self, ttl: int, refresher: SessionRefresher, reaper: SessionReaper
+    ):
+        super().__init__(ttl)
+        self.refresher = refresher
+        self.reaper = reaper
+
+    def start(self):
+        self.refresher.start()
+        self.reaper.start()
+
+    async def stop(self):
+        await self.reaper.stop()
+        await self.refresher.stop()
+
+    def create_statements(self, token: str) -> list[Statement]:
+        return [(
+            "INSERT INTO session (user_id, token, expiration) "
+            "VALUES (@user_id, %s, DATE_ADD(NOW(), INTERVAL %s SECOND))",
+            (token, self.ttl),
+        )]
+
+    def revoke_user_statements(self) -> list[Statement]:
+        return [("DELETE FROM session WHERE user_id = @user_id", ())]
+
+    async def create(self, user_id: int) -> str:
+        token = generate_token()
+        async with Connection(multi=True) as conn:
+            cursor = await conn.cursor()
+            await execute_batch(
+                cursor,
+                [
+                    ("SET @user_id = %s", (user_id,)),
+                    *self.create_statements(token),
+                ],
+            )
+        return token
+
+    async def find(self, token: str) -> SessionInfo | None:
+        session = await self.select(token, read_only=True)
+        if not session and Connection.replicas:
+            # The session may not have reached the replica yet
+            session = await self.select(token)
+        return session
+
+    @staticmethod
+    async def select(
+        token: str, read_only: bool = False
+    ) -> SessionInfo | None:
+        """
+        Find an unexpired session with the role of its user
+        Args:
+            token (str): The token
+            read_only (bool): Whether a replica may serve the lookup
+        Returns:
+            SessionInfo | None: The session
+        """
+        async with Connection(read_only=read_only) as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "SELECT session.user_id, "
+                "TIMESTAMPDIFF(SECOND, NOW(), session.expiration), user.role "
+                "FROM session JOIN user ON user.id = session.user_id "
+                "WHERE session.token = %s AND session.expiration > NOW()",
+                (token,),
+            )
+            session_data = await cursor.fetchone()
+        return SessionInfo(*session_data) if session_data else None
+
+    async def refresh(self, token: str, user_id: int):
+        await self.refresher.refresh(token)
+
+    async def revoke(self, token: str):
+        async with Connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "DELETE FROM session WHERE token = %s", (token,)
+            )
+
+    async def revoke_user(self, user_id: int):
+        async with Connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "DELETE FROM session WHERE user_id = %s", (user_id,)
+            )
@@ -1,11 +1,18 @@
+import json
+
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
 from httpx._transports.asgi import ASGITransport
 
 from api import app
 from database.mariadb.connection import Connection
+from database.mariadb.migrate import migrate
 from general.config import get_config
-from users.methods import User
+from general.ratelimit import RateLimiter
+from users import ratelimit
+from users.methods import User, user_versions
+from users.tokens import is_signed, token_signer
 from users.schemas import UserLoginRequest
 
 config = get_config()
@@ -16,6 +23,12 @@ def anyio_backend():
     return "asyncio"
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    for limiter in ratelimit.limiters.values():
+        limiter.clear()
+
+
 @pytest.fixture(scope="function")
 async def async_client() -> AsyncClient:
     async with AsyncClient(
@@ -35,6 +48,7 @@ async def prepare_db():
             if not query.strip():
                 continue
             await cur.execute(query)
+    await migrate()
 
 
 @pytest.fixture(scope="function")
@@ -58,6 +72,61 @@ async def login_user(request):
     )
 
 
+@pytest.mark.anyio
+async def test_login_rate_limited(monkeypatch, async_client: AsyncClient):
+    limiter = RateLimiter(rate=0.1, burst=1, max_keys=10)
+    monkeypatch.setattr(ratelimit, "account_limiter", limiter)
+    limiter.hit("user@email.com")
+    login_data = {
+        "username_or_email": "User@email.com",
+        "password": "User123!",
+    }
+    response = await async_client.post("/users/login", json=login_data)
+    assert response.status_code == 429
+    assert response.json() == {"error": "Too Many Requests"}
+    assert 1 <= int(response.headers["retry-after"]) <= 10
+
+
+@pytest.mark.anyio
+async def test_signed_tokens(
+    monkeypatch, prepare_db, async_client: AsyncClient
+):
+    monkeypatch.setattr(config, "TOKEN_MODE", "signed")
+    login_data = {
+        "username_or_email": "user@email.com",
+        "password": "User123!",
+    }
+    response = await async_client.post("/users/login", json=login_data)
+    assert response.status_code == 200
+    access_token = response.cookies.get("token")
+    refresh_token = response.cookies.get("refresh_token")
+    assert is_signed(access_token)
+    assert not is_signed(refresh_token)
+    user = await User.authorize(access_token)
+    assert (user.id, user.role) == (3, "user")
+    async_client.cookies.set("refresh_token", refresh_token)
+    response = await async_client.post("/users/refresh")
+    assert response.status_code == 200
+    assert is_signed(response.cookies.get("token"))
+    async_client.cookies.set("token", access_token)
+    response = await async_client.post("/users/logout")
+    assert response.status_code == 200
+    for token in (access_token, refresh_token):
+        with pytest.raises(HTTPException) as err:
+            await User.authorize(token)
+        assert err.value.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_signed_tokens_disabled(async_client: AsyncClient):
+    async_client.cookies.set("refresh_token", "session_token")
+    response = await async_client.post("/users/refresh")
+    assert response.status_code == 404
+    with pytest.raises(HTTPException) as err:
+        await User.authorize(token_signer.sign(1, "admin"))
+    assert err.value.status_code == 401
+
+
 @pytest.mark.anyio
 async def test_login(
     prepare_db, async_client: AsyncClient
@@ -102,6 +171,44 @@ async def test_read_user(
     }
 
 
+@pytest.mark.anyio
+async def test_read_users_batch(prepare_db, async_client: AsyncClient):
+    response = await async_client.get("/users/batch?ids=3&ids=100&ids=1")
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()] == [3, 1]
+    response = await async_client.get("/users/batch")
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("login_user", [3], indirect=True)
+async def test_read_user_conditional(
+    prepare_db, async_client: AsyncClient, login_user
+):
+    user_versions.clear()
+    response = await async_client.get("/users/3")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == config.USER_CACHE_CONTROL
+    etag = response.headers["etag"]
+    response = await async_client.get(
+        "/users/3", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    async_client.cookies.set("token", login_user)
+    response = await async_client.patch(
+        "/users/3", json={"username": "EditedUser"}
+    )
+    assert response.status_code == 200
+    response = await async_client.get(
+        "/users/3", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["username"] == "EditedUser"
+
+
 @pytest.mark.anyio
 @pytest.mark.parametrize("login_user", [1], indirect=True)
 async def test_update_user_admin(
@@ -248,36 +355,61 @@ async def test_search_user(
 ):
     response = await async_client.get("/users/?query=admin")
     assert response.status_code == 200
-    assert response.json() == [
-        {
-            "id": 1,
-            "username": "Admin",
-            "role": "admin",
-            "profile_picture": None,
-        }
-    ]
+    assert response.json() == {
+        "items": [
+            {
+                "id": 1,
+                "username": "Admin",
+                "role": "admin",
+                "profile_picture": None,
+            }
+        ],
+        "next_cursor": None,
+    }
     response = await async_client.get("/users/")
     assert response.status_code == 200
-    assert response.json() == [
-        {
-            "id": 1,
-            "username": "Admin",
-            "role": "admin",
-            "profile_picture": None,
-        },
-        {
-            "id": 2,
-            "username": "NewUser",
-            "role": "new_user",
-            "profile_picture": None,
-        },
-        {
-            "id": 3,
-            "username": "User",
-            "role": "user",
-            "profile_picture": None,
-        },
-    ]
+    assert response.json() == {
+        "items": [
+            {
+                "id": 1,
+                "username": "Admin",
+                "role": "admin",
+                "profile_picture": None,
+            },
+            {
+                "id": 2,
+                "username": "NewUser",
+                "role": "new_user",
+                "profile_picture": None,
+            },
+            {
+                "id": 3,
+                "username": "User",
+                "role": "user",
+                "profile_picture": None,
+            },
+        ],
+        "next_cursor": None,
+    }
+
+
+@pytest.mark.anyio
+async def test_search_user_pagination(
+    prepare_db, async_client: AsyncClient
+):
+    response = await async_client.get("/users/?limit=2")
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()["items"]] == [1, 2]
+    cursor = response.json()["next_cursor"]
+    response = await async_client.get(f"/users/?limit=2&cursor={cursor}")
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()["items"]] == [3]
+    assert response.json()["next_cursor"] is None
+    response = await async_client.get("/users/?limit=1000")
+    assert response.status_code == 422
+    response = await async_client.get("/users/?cursor=invalid")
+    assert response.status_code == 422
+    assert response.json() == {"error": "Invalid cursor"}
 
 
 @pytest.mark.anyio
@@ -287,3 +419,31 @@ async def test_confirm_user(
     response = await async_client.post("/users/confirm?token=new_user_token")
     assert response.status_code == 200
     assert response.json() == {"message": "User confirmed"}
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("login_user", [1], indirect=True)
+async def test_export_users(
+    prepare_db, async_client: AsyncClient, login_user
+):
+    async_client.cookies.set("token", login_user)
+    response = await async_client.get("/users/export?query=user")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [
+        json.loads(line)["id"] for line in response.text.splitlines()
+    ] == [3, 2]
+    response = await async_client.get("/users/export?format=json")
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()] == [1, 2, 3]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("login_user", [3], indirect=True)
+async def test_export_users_not_admin(
+    prepare_db, async_client: AsyncClient, login_user
+):
+    async_client.cookies.set("token", login_user)
+    response = await async_client.get("/users/export")
+    assert response.status_code == 403
+    assert response.json() == {"error": "Unauthorized"}
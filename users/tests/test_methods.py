@@ -1,9 +1,15 @@
+import asyncio
+
 import pytest
 
 from fastapi import HTTPException
-from database.mariadb.connection import Connection
+from database.mariadb.connection import Connection, used_primary
+from database.mariadb.migrate import migrate
 from general.config import get_config
-from users.methods import User
+from movies.methods import Movie
+from users.methods import User, search_flight, user_loader
+from users.reaper import SessionReaper
+from users.security import DUMMY_HASH, password_hasher
 from users.schemas import (
     UserLoginRequest,
     UserCreateRequest,
@@ -30,6 +36,7 @@ async def prepare_db():
             if not query.strip():
                 continue
             await cur.execute(query)
+    await migrate()
 
 
 @pytest.mark.anyio
@@ -67,6 +74,23 @@ async def test_login_with_invalid_email(prepare_db):
         assert err.detail == "Invalid username, email or password"
 
 
+@pytest.mark.anyio
+async def test_login_unknown_account_verifies(prepare_db, monkeypatch):
+    verified = []
+
+    async def verify(password: str, encoded: str):
+        verified.append(encoded)
+        return False, False
+
+    monkeypatch.setattr(password_hasher, "verify", verify)
+    with pytest.raises(HTTPException) as err:
+        await User.login(
+            UserLoginRequest(username_or_email="nobody", password="x")
+        )
+    assert err.value.status_code == 401
+    assert verified == [DUMMY_HASH]
+
+
 @pytest.mark.anyio
 async def test_login_with_invalid_password(prepare_db):
     user_credentials = {
@@ -88,7 +112,7 @@ async def test_register_user(prepare_db):
         "password": "NewestUser123!",
     }
     await User.create(UserCreateRequest(**user_data))
-    users: list[UserReadResponse] = await User.search("newest_user")
+    users: list[UserReadResponse] = (await User.search("newest_user")).items
     assert len(users) == 1
     assert users[0].id == 4
     assert users[0].username == "newest_user"
@@ -126,7 +150,7 @@ async def test_register_user_with_existing_username(prepare_db):
 @pytest.mark.anyio
 async def test_confirm_user(prepare_db):
     await User.confirm("new_user_token")
-    users: list[UserReadResponse] = await User.search("NewUser")
+    users: list[UserReadResponse] = (await User.search("NewUser")).items
     assert len(users) == 1
     assert users[0].id == 2
     assert users[0].username == "NewUser"
@@ -159,7 +183,7 @@ async def test_update_user(prepare_db):
         "password": "EditedUser123!",
     }
     await User.update(1, UserUpdateRequest(**user_data))
-    users: list[UserReadResponse] = await User.search("edited_user")
+    users: list[UserReadResponse] = (await User.search("edited_user")).items
     assert len(users) == 1
     assert users[0].id == 1
     assert users[0].username == "edited_user"
@@ -214,7 +238,7 @@ async def test_update_user_with_partial_data(prepare_db):
         "username": "edited_user",
     }
     await User.update(1, UserUpdateRequest(**user_data))
-    users: list[UserReadResponse] = await User.search("edited_user")
+    users: list[UserReadResponse] = (await User.search("edited_user")).items
     assert len(users) == 1
     assert users[0].id == 1
     assert users[0].username == "edited_user"
@@ -223,25 +247,39 @@ async def test_update_user_with_partial_data(prepare_db):
 
 @pytest.mark.anyio
 async def test_search_user(prepare_db):
-    users: list[UserReadResponse] = await User.search("user")
+    users: list[UserReadResponse] = (await User.search("user")).items
     assert len(users) == 2
+    assert users[0].id == 3
+    assert users[0].username == "User"
+    assert users[0].role == "user"
+    assert users[1].id == 2
+    assert users[1].username == "NewUser"
+    assert users[1].role == "new_user"
+
+
+@pytest.mark.anyio
+async def test_search_user_prefix(prepare_db):
+    users: list[UserReadResponse] = (await User.search("ne")).items
+    assert len(users) == 1
+    assert users[0].id == 2
+    # Short queries still match inside the username
+    users: list[UserReadResponse] = (await User.search("ew")).items
+    assert len(users) == 1
+    assert users[0].id == 2
+    users: list[UserReadResponse] = (await User.search("ewUs")).items
+    assert len(users) == 1
     assert users[0].id == 2
-    assert users[0].username == "NewUser"
-    assert users[0].role == "new_user"
-    assert users[1].id == 3
-    assert users[1].username == "User"
-    assert users[1].role == "user"
 
 
 @pytest.mark.anyio
 async def test_search_user_not_found(prepare_db):
-    users: list[UserReadResponse] = await User.search("invalid_user")
+    users: list[UserReadResponse] = (await User.search("invalid_user")).items
     assert len(users) == 0
 
 
 @pytest.mark.anyio
 async def test_search_user_empty(prepare_db):
-    users: list[UserReadResponse] = await User.search("")
+    users: list[UserReadResponse] = (await User.search("")).items
     assert len(users) == 3
     assert users[0].id == 1
     assert users[0].username == "Admin"
@@ -271,13 +309,55 @@ async def test_read_user_not_found(prepare_db):
         assert err.detail == "User not found"
 
 
+@pytest.mark.anyio
+async def test_read_many_users(prepare_db):
+    users = await User.read_many([3, 100, 1, 3])
+    assert [user.id for user in users] == [3, 1]
+
+
+@pytest.mark.anyio
+async def test_concurrent_reads_are_batched(prepare_db):
+    # Reads after a write in the same context skip the loader
+    used_primary.set(False)
+    batches = user_loader.batches
+    users = await asyncio.gather(User.read(1), User.read(2), User.read(1))
+    assert [user.id for user in users] == [1, 2, 1]
+    assert user_loader.batches == batches + 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_searches_are_coalesced(prepare_db):
+    used_primary.set(False)
+    executed = search_flight.executed
+    pages = await asyncio.gather(*(User.search("user") for _ in range(3)))
+    assert all(page == pages[0] for page in pages)
+    assert search_flight.executed == executed + 1
+
+
 @pytest.mark.anyio
 async def test_delete_user(prepare_db):
     await User.delete(1)
-    users: list[UserReadResponse] = await User.search("admin")
+    users: list[UserReadResponse] = (await User.search("admin")).items
     assert len(users) == 0
 
 
+@pytest.mark.anyio
+async def test_delete_rated_user(prepare_db):
+    async with Connection() as con:
+        cur = await con.cursor()
+        await cur.execute(
+            "INSERT INTO movie (title, description, year, runtime, genres, "
+            "director, poster, background, imdb_rating, tmdb_rating, "
+            "ace_rating, ace_user_rating) "
+            "VALUES ('Fight Club', '', 1999, 139, '', '', '', '', 0, 0, 0, 0)"
+        )
+    await Movie.rate(1, 1, 8)
+    await Movie.rate(1, 3, 4)
+    await User.delete(3)
+    movie = await Movie.read(1)
+    assert (movie.ace_user_rating, movie.ace_user_rating_count) == (8, 1)
+
+
 @pytest.mark.anyio
 async def test_delete_user_not_found(prepare_db):
     with pytest.raises(HTTPException) as err:
@@ -285,3 +365,20 @@ async def test_delete_user_not_found(prepare_db):
 
         assert err.status_code == 404
         assert err.detail == "User not found"
+
+
+@pytest.mark.anyio
+async def test_reap_expired_sessions(prepare_db):
+    async with Connection() as con:
+        cur = await con.cursor()
+        await cur.executemany(
+            "INSERT INTO session (user_id, token, expiration) "
+            "VALUES (3, %s, DATE_SUB(NOW(), INTERVAL 1 HOUR))",
+            [(f"expired_token_{i}",) for i in range(5)],
+        )
+    reaper = SessionReaper(batch_size=2, interval=0)
+    assert await reaper.reap() == 5
+    assert reaper.removed_total == 5
+    assert await reaper.reap() == 0
+    auth = await User.authorize("user_token")
+    assert auth.id == 3
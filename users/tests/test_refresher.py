@@ -0,0 +1,70 @@
+import pytest
+
+from users.refresher import SessionRefresher
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="function")
+async def refresher(monkeypatch):
+    writes = []
+
+    async def write(tokens: list[str]):
+        writes.append(tokens)
+
+    refresher = SessionRefresher(max_size=2, interval=60)
+    monkeypatch.setattr(refresher, "write", write)
+    refresher.writes = writes
+    refresher.start()
+    yield refresher
+    await refresher.task.stop()
+
+
+@pytest.mark.anyio
+async def test_refresh_is_batched(refresher):
+    await refresher.refresh("a")
+    await refresher.refresh("b")
+    await refresher.refresh("a")
+    assert refresher.writes == []
+    await refresher.flush()
+    assert refresher.writes == [["a", "b"]]
+    assert refresher.deduplicated == 1
+    assert refresher.flushed == 2
+
+
+@pytest.mark.anyio
+async def test_refresh_queue_is_bounded(refresher):
+    await refresher.refresh("a")
+    await refresher.refresh("b")
+    await refresher.refresh("c")
+    assert refresher.dropped == 1
+    await refresher.stop()
+    assert refresher.writes == [["a", "b"]]
+
+
+@pytest.mark.anyio
+async def test_refresh_without_task(refresher):
+    await refresher.task.stop()
+    await refresher.refresh("a")
+    assert refresher.writes == [["a"]]
+
+
+@pytest.mark.anyio
+async def test_failed_flush_is_retried(refresher, monkeypatch):
+    async def fail(tokens: list[str]):
+        raise ConnectionError("database unavailable")
+
+    await refresher.refresh("a")
+    await refresher.refresh("b")
+    write = refresher.write
+    monkeypatch.setattr(refresher, "write", fail)
+    with pytest.raises(ConnectionError):
+        await refresher.flush()
+    assert list(refresher.pending) == ["a", "b"]
+    monkeypatch.setattr(refresher, "write", write)
+    await refresher.flush()
+    assert refresher.writes == [["a", "b"]]
+    assert refresher.flushed == 2
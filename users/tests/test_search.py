@@ -0,0 +1,57 @@
+from users.search import (
+    escape_like,
+    index_statements,
+    search_statement,
+    trigrams,
+)
+
+
+def test_trigrams():
+    assert trigrams("User") == {"use", "ser"}
+    assert trigrams("aaaa") == {"aaa"}
+    assert trigrams("ab") == set()
+
+
+def test_escape_like():
+    assert escape_like("user") == "user"
+    assert escape_like("new_user%") == "new\\_user\\%"
+    assert escape_like("a\\b") == "a\\\\b"
+
+
+def test_search_statement_empty():
+    sql, params = search_statement("")
+    assert sql == (
+        "SELECT user.id, user.username, user.role, user.profile_picture, "
+        "0 AS relevance FROM user ORDER BY user.id"
+    )
+    assert params == []
+
+
+def test_search_statement_short():
+    sql, params = search_statement("ad")
+    assert "user_trigram" not in sql
+    assert params == ["ad", "ad%", "%ad%"]
+
+
+def test_search_statement_substring():
+    sql, params = search_statement("User")
+    assert "user_trigram" in sql
+    assert params == ["User", "User%", "ser", "use", 2, "%User%"]
+
+
+def test_search_statement_keyset():
+    sql, params = search_statement("", limit=10, after=(0, 5))
+    assert "CASE" not in sql
+    assert sql.endswith("WHERE user.id > %s ORDER BY user.id LIMIT %s")
+    assert params == [5, 10]
+    sql, params = search_statement("ad", limit=10, after=(1, 5))
+    assert "user.id) > (%s, %s)" in sql
+    assert params == ["ad", "ad%", "%ad%", "ad", "ad%", 1, 5, 10]
+
+
+def test_index_statements():
+    (delete, _), (insert, params) = index_statements("User")
+    assert delete == "DELETE FROM user_trigram WHERE user_id = @user_id"
+    assert insert.endswith("VALUES (%s, @user_id), (%s, @user_id)")
+    assert params == ["ser", "use"]
+    assert len(index_statements("ab")) == 1
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from users import security
+from users.security import (
+    PasswordHasher,
+    hash_value,
+    scrypt_hash,
+    scrypt_outdated,
+    scrypt_verify,
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def cheap(monkeypatch):
+    monkeypatch.setattr(security.config, "PASSWORD_SCRYPT_N", 16)
+    monkeypatch.setattr(security.config, "PASSWORD_SCRYPT_R", 1)
+    monkeypatch.setattr(security.config, "PASSWORD_SCRYPT_P", 1)
+
+
+def test_scrypt_roundtrip():
+    encoded = scrypt_hash("Password123!", 16, 1, 1)
+    assert encoded.startswith("scrypt$16$1$1$")
+    assert scrypt_verify("Password123!", encoded)
+    assert not scrypt_verify("Password123?", encoded)
+    assert encoded != scrypt_hash("Password123!", 16, 1, 1)
+
+
+def test_scrypt_outdated(cheap):
+    assert scrypt_outdated(hash_value("Password123!"))
+    assert scrypt_outdated(scrypt_hash("Password123!", 32, 1, 1))
+    assert not scrypt_outdated(scrypt_hash("Password123!", 16, 1, 1))
+
+
+@pytest.mark.anyio
+async def test_verify_rehashes_legacy(cheap):
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    legacy = hash_value("Password123!")
+    assert await hasher.verify("Password123!", legacy) == (True, True)
+    assert await hasher.verify("Password123?", legacy) == (False, False)
+    encoded = await hasher.hash("Password123!")
+    assert await hasher.verify("Password123!", encoded) == (True, False)
+
+
+@pytest.mark.anyio
+async def test_hasher_rejects_when_saturated(cheap):
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    results = await asyncio.gather(
+        *(hasher.hash("Password123!") for _ in range(3)),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, HTTPException)]
+    assert len(errors) == 1
+    assert errors[0].status_code == 503
+    assert hasher.pending == 0
+
+
+def test_dummy_hash_costs_a_full_verify():
+    # An outdated or legacy dummy would verify faster than a real account
+    assert security.DUMMY_HASH.startswith("scrypt$")
+    assert not scrypt_outdated(security.DUMMY_HASH)
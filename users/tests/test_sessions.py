@@ -0,0 +1,128 @@
+from unittest.mock import patch
+
+import pytest
+
+from database.kv.client import KeyValueClient, RespError
+from database.kv.tests.server import FakeKeyValueServer
+from users.sessions import (
+    KeyValueSessionStore,
+    MemorySessionStore,
+    SessionStore,
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(params=["memory", "kv"])
+async def store(request):
+    if request.param == "memory":
+        yield MemorySessionStore(ttl=60, shards=4, sweep_interval=0)
+        return
+    server = FakeKeyValueServer()
+    await server.start()
+    store = KeyValueSessionStore(60, KeyValueClient("127.0.0.1", server.port))
+    yield store
+    await store.stop()
+    await server.stop()
+
+
+@pytest.mark.anyio
+async def test_create_and_find(store: SessionStore):
+    token = await store.create(1)
+    session = await store.find(token)
+    assert session.user_id == 1
+    assert 58 <= session.ttl <= 60
+    assert session.role is None
+    assert await store.find("missing") is None
+
+
+@pytest.mark.anyio
+async def test_revoke(store: SessionStore):
+    first = await store.create(1)
+    second = await store.create(1)
+    await store.revoke(first)
+    assert await store.find(first) is None
+    assert (await store.find(second)).user_id == 1
+
+
+@pytest.mark.anyio
+async def test_revoke_user(store: SessionStore):
+    tokens = [await store.create(1) for _ in range(3)]
+    other = await store.create(2)
+    await store.revoke_user(1)
+    for token in tokens:
+        assert await store.find(token) is None
+    assert (await store.find(other)).user_id == 2
+
+
+@pytest.mark.anyio
+async def test_memory_sessions_expire():
+    store = MemorySessionStore(ttl=60, shards=4, sweep_interval=0)
+    with patch("users.sessions.memory.monotonic", return_value=0):
+        expired = await store.create(1)
+        refreshed = await store.create(1)
+    with patch("users.sessions.memory.monotonic", return_value=30):
+        await store.refresh(refreshed, 1)
+    with patch("users.sessions.memory.monotonic", return_value=61):
+        assert await store.find(expired) is None
+        assert (await store.find(refreshed)).ttl == 29
+        await store.create(2)
+    with patch("users.sessions.memory.monotonic", return_value=100):
+        assert await store.sweep() == 1
+    assert len(store) == 1
+    assert list(store.users) == [2]
+
+
+@pytest.mark.anyio
+async def test_kv_refresh_extends_ttl():
+    server = FakeKeyValueServer()
+    await server.start()
+    store = KeyValueSessionStore(60, KeyValueClient("127.0.0.1", server.port))
+    try:
+        token = await store.create(1)
+        store.ttl = 120
+        await store.refresh(token, 1)
+        assert (await store.find(token)).ttl >= 119
+        assert await store.client.execute("TTL", "user_sessions:1") >= 119
+    finally:
+        await store.stop()
+        await server.stop()
+
+
+@pytest.fixture
+async def kv_store():
+    server = FakeKeyValueServer()
+    await server.start()
+    store = KeyValueSessionStore(60, KeyValueClient("127.0.0.1", server.port))
+    store.server = server
+    yield store
+    await store.stop()
+    await server.stop()
+
+
+@pytest.mark.anyio
+async def test_kv_create_raises_error_replies(kv_store):
+    kv_store.server.failing.add("SET")
+    with pytest.raises(RespError, match="READONLY"):
+        await kv_store.create(1)
+
+
+@pytest.mark.anyio
+async def test_kv_revoke_raises_error_replies(kv_store):
+    token = await kv_store.create(1)
+    kv_store.server.failing.add("DEL")
+    with pytest.raises(RespError, match="READONLY"):
+        await kv_store.revoke(token)
+    kv_store.server.failing.clear()
+    assert (await kv_store.find(token)).user_id == 1
+
+
+@pytest.mark.anyio
+async def test_kv_find_raises_error_replies(kv_store):
+    token = await kv_store.create(1)
+    kv_store.server.failing.add("TTL")
+    with pytest.raises(RespError, match="READONLY"):
+        await kv_store.find(token)
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+import pytest
+
+from users.tokens import (
+    RevocationList,
+    TokenSigner,
+    b64encode,
+    is_signed,
+)
+
+
+def test_sign_and_verify():
+    signer = TokenSigner(b"secret", ttl=300)
+    token = signer.sign(7, "admin")
+    assert is_signed(token)
+    claims = signer.verify(token)
+    assert (claims.user_id, claims.role) == (7, "admin")
+    assert claims.expires_at - claims.issued_at == pytest.approx(300, abs=1)
+
+
+def test_verify_rejects_tampering():
+    signer = TokenSigner(b"secret", ttl=300)
+    body, _, mac = signer.sign(7, "user").partition(".")
+    forged = b64encode(b"7:0:9999999999:admin").decode()
+    assert signer.verify(f"{forged}.{mac}") is None
+    assert TokenSigner(b"other", ttl=300).verify(f"{body}.{mac}") is None
+    assert signer.verify(f"{body}.") is None
+    assert signer.verify("not-a-token") is None
+
+
+def test_verify_rejects_expired():
+    signer = TokenSigner(b"secret", ttl=300)
+    with patch("users.tokens.time", return_value=1000.0):
+        token = signer.sign(7, "user")
+    with patch("users.tokens.time", return_value=1299.0):
+        assert signer.verify(token) is not None
+    with patch("users.tokens.time", return_value=1300.0):
+        assert signer.verify(token) is None
+
+
+def test_revocation_covers_earlier_tokens():
+    signer = TokenSigner(b"secret", ttl=300)
+    revocations = RevocationList(ttl=300, interval=0)
+    with patch("users.tokens.time", return_value=1000.0):
+        before = signer.verify(signer.sign(7, "user"))
+        other = signer.verify(signer.sign(8, "user"))
+    revocations.add(7, 1000.5)
+    revocations.add(7, 900.0)
+    with patch("users.tokens.time", return_value=1001.0):
+        after = signer.verify(signer.sign(7, "user"))
+    assert revocations.is_revoked(before)
+    assert not revocations.is_revoked(after)
+    assert not revocations.is_revoked(other)
@@ -24,7 +24,7 @@ def test_validate_username():
 
 
 def test_validate_password():
-    assert len(validate_password("Password123!")) == 64
+    assert validate_password("Password123!") == "Password123!"
     with pytest.raises(ValueError) as err:
         validate_password("Pas123!")
     assert err.value.args[0] == "Password must be at least 8 characters long"
@@ -0,0 +1,185 @@
+import hmac
+import logging
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodeError
+from hashlib import sha256
+from os import urandom
+from time import time
+from typing import NamedTuple
+
+from database.mariadb.connection import Connection
+from general.config import get_config
+from general.metrics import registry
+from general.tasks import PeriodicTask
+
+logger = logging.getLogger(__name__)
+config = get_config()
+
+
+class TokenClaims(NamedTuple):
+    user_id: int
+    role: str
+    issued_at: float
+    expires_at: float
+
+
+def b64encode(data: bytes) -> bytes:
+    return urlsafe_b64encode(data).rstrip(b"=")
+
+
+def b64decode(data: bytes) -> bytes:
+    return urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def is_signed(token: str) -> bool:
+    """Tell signed access tokens apart from opaque session tokens."""
+    return "." in token
+
+
+class TokenSigner:
+    """Issue and verify HMAC-SHA256 signed access tokens."""
+
+    secret: bytes
+    ttl: int
+
+    def __init__(self, secret: bytes, ttl: int):
+        self.secret = secret
+        self.ttl = ttl
+
+    def mac(self, body: bytes) -> bytes:
+        return b64encode(hmac.new(self.secret, body, sha256).digest())
+
+    def sign(self, user_id: int, role: str) -> str:
+        """
+        Issue an access token
+        Args:
+            user_id (int): The user id
+            role (str): The role of the user
+        Returns:
+            str: The token, valid for `ttl` seconds
+        """
+        now = time()
+        body = b64encode(
+            f"{user_id}:{now:.6f}:{now + self.ttl:.0f}:{role}".encode()
+        )
+        return (body + b"." + self.mac(body)).decode()
+
+    def verify(self, token: str) -> TokenClaims | None:
+        """
+        Check the signature and expiry of an access token, without I/O
+        Args:
+            token (str): The token
+        Returns:
+            TokenClaims | None: The claims, or None if invalid or expired
+        """
+        body, _, mac = token.encode().partition(b".")
+        if not hmac.compare_digest(mac, self.mac(body)):
+            return None
+        try:
+            user_id, issued_at, expires_at, role = (
+                b64decode(body).decode().split(":", 3)
+            )
+            claims = TokenClaims(
+                int(user_id), role, float(issued_at), float(expires_at)
+            )
+        except (DecodeError, UnicodeDecodeError, ValueError):
+            return None
+        if claims.expires_at <= time():
+            return None
+        return claims
+
+
+class RevocationList:
+    """
+    Users whose signed access tokens issued so far must be rejected.
+    Revocations are written to `token_revocation` and the recent ones are
+    mirrored in memory, synced periodically from the other workers. An
+    entry is only needed until the tokens it covers have expired.
+    """
+
+    revoked: dict[int, float]
+    task: PeriodicTask
+
+    def __init__(self, ttl: int, interval: float):
+        self.ttl = ttl
+        self.revoked = {}
+        self.task = PeriodicTask("token revocation sync", interval, self.sync)
+
+    def start(self):
+        self.task.start()
+
+    async def stop(self):
+        await self.task.stop()
+
+    def add(self, user_id: int, revoked_at: float):
+        if revoked_at > self.revoked.get(user_id, 0):
+            self.revoked[user_id] = revoked_at
+
+    def is_revoked(self, claims: TokenClaims) -> bool:
+        revoked_at = self.revoked.get(claims.user_id)
+        return revoked_at is not None and claims.issued_at <= revoked_at
+
+    async def revoke(self, user_id: int):
+        """
+        Reject every access token issued to a user until now
+        Args:
+            user_id (int): The user id
+        """
+        revoked_at = time()
+        self.add(user_id, revoked_at)
+        async with Connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "INSERT INTO token_revocation (user_id, revoked_at) "
+                "VALUES (%s, %s) ON DUPLICATE KEY UPDATE "
+                "revoked_at = GREATEST(revoked_at, VALUES(revoked_at))",
+                (user_id, revoked_at),
+            )
+
+    async def sync(self):
+        """Purge expired revocations and load the current ones."""
+        horizon = time() - self.ttl
+        async with Connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "DELETE FROM token_revocation WHERE revoked_at < %s",
+                (horizon,),
+            )
+            await cursor.execute(
+                "SELECT user_id, revoked_at FROM token_revocation"
+            )
+            rows = await cursor.fetchall()
+        revoked = {
+            user_id: revoked_at
+            for user_id, revoked_at in self.revoked.items()
+            if revoked_at >= horizon
+        }
+        self.revoked = revoked
+        for user_id, revoked_at in rows:
+            self.add(user_id, revoked_at)
+
+
+def token_secret() -> bytes:
+    if config.TOKEN_SECRET:
+        return config.TOKEN_SECRET.encode()
+    if config.TOKEN_MODE == "signed":
+        logger.warning(
+            "TOKEN_SECRET is not set, access tokens will not be accepted "
+            "by other workers or after a restart"
+        )
+    return urandom(32)
+
+
+token_signer = TokenSigner(token_secret(), config.ACCESS_TOKEN_TTL)
+revocation_list = RevocationList(
+    config.ACCESS_TOKEN_TTL, config.TOKEN_REVOCATION_SYNC_INTERVAL
+)
+
+token_revocations = registry.gauge(
+    "token_revocations", "Users with revoked access tokens held in memory"
+)
+
+
+@registry.collector
+def collect_revocation_stats():
+    token_revocations.labels().set(len(revocation_list.revoked))
@@ -1,8 +1,6 @@
 from email_validator import EmailNotValidError
 from email_validator import validate_email as validate_e
 
-from .security import hash_value
-
 
 def validate_username(v: str) -> str:
     if len(v) < 4:
@@ -32,7 +30,7 @@ def validate_password(v: str) -> str:
         raise ValueError("Password must contain at least 1 special character")
     if not all((c.isalnum() or c in special) for c in v):
         raise ValueError(f"Special characters allowed are: {special}")
-    return hash_value(v)
+    return v
 
 
 def validate_email(v: str) -> str: